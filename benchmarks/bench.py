@@ -0,0 +1,300 @@
+"""Microbenchmarks for the codecs, NBT and the login pipeline.
+
+Run from the repository root::
+
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --compare results.json
+"""
+
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import statistics
+import struct
+import sys
+import time
+import timeit
+import uuid
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from twisted.internet.testing import StringTransport
+
+from main import Login, ServerFactory
+from src import nbt
+from src.buffer import Buffer, WriteBuffer
+from src.compression import Compression
+from src.packets.configuration import load_registry_data
+from src.packets.packet import Packet
+from src.stages.status import ServerStatus
+from src.structs import Position, String, VarInt
+
+benchmarks: dict[str, Callable[[], Callable[[], object]]] = dict()
+
+
+def benchmark(name: str):
+    """Registers a setup function that returns the callable to time"""
+
+    def register(setup: Callable[[], Callable[[], object]]):
+        benchmarks[name] = setup
+        return setup
+
+    return register
+
+
+def frame(packet_id: int, body: bytes = b"") -> bytes:
+    payload = VarInt.pack(packet_id) + body
+    return VarInt.pack(len(payload)) + payload
+
+
+def connect(factory: ServerFactory):
+    server = factory.buildProtocol(None)
+    transport = StringTransport()
+    server.makeConnection(transport)
+    return server, transport
+
+
+HANDSHAKE = frame(
+    0x00,
+    VarInt.pack(765) + String.pack("localhost") + struct.pack(">H", 25565) + b"\x02",
+)
+LOGIN_START = frame(0x00, String.pack("bench") + uuid.UUID(int=1).bytes)
+LOGIN_ACKNOWLEDGED = frame(0x03)
+CLIENT_INFORMATION = frame(0x00)
+
+
+def join(factory: ServerFactory):
+    server, transport = connect(factory)
+    server.dataReceived(HANDSHAKE + LOGIN_START + LOGIN_ACKNOWLEDGED)
+    server.dataReceived(CLIENT_INFORMATION)
+    return server, transport
+
+
+@benchmark("varint.pack")
+def varint_pack():
+    values = [random.randrange(-(2**31), 2**31) for _ in range(1000)]
+    return lambda: [VarInt.pack(value) for value in values]
+
+
+@benchmark("varint.pack_many")
+def varint_pack_many():
+    values = [random.randrange(-(2**31), 2**31) for _ in range(1000)]
+    return lambda: VarInt.pack_many(values)
+
+
+@benchmark("varint.pack_small")
+def varint_pack_small():
+    values = [random.randrange(0, 0x4000) for _ in range(1000)]
+    return lambda: [VarInt.pack(value) for value in values]
+
+
+@benchmark("varint.unpack")
+def varint_unpack():
+    data = b"".join(VarInt.pack(random.randrange(-(2**31), 2**31)) for _ in range(1000))
+    return lambda: [
+        VarInt.unpack(buffer) for buffer in [Buffer(data)] for _ in range(1000)
+    ]
+
+
+@benchmark("varint.unpack_from")
+def varint_unpack_from():
+    values = [random.randrange(-(2**31), 2**31) for _ in range(1000)]
+    data = memoryview(VarInt.pack_many(values))
+    return lambda: VarInt.unpack_many(data, len(values))
+
+
+@benchmark("buffer.pack_primitives")
+def buffer_pack_primitives():
+    def run():
+        buffer = WriteBuffer()
+        for _ in range(100):
+            buffer.pack_int(1)
+            buffer.pack_long(2)
+            buffer.pack_double(3.0)
+            buffer.pack_bool(True)
+            buffer.pack_string("minecraft:overworld")
+            buffer.pack_varint(300)
+
+    return run
+
+
+@benchmark("buffer.unpack_primitives")
+def buffer_unpack_primitives():
+    source = WriteBuffer()
+    for _ in range(100):
+        source.pack_int(1)
+        source.pack_long(2)
+        source.pack_double(3.0)
+        source.pack_bool(True)
+        source.pack_string("minecraft:overworld")
+        source.pack_varint(300)
+    data = source.getvalue()
+
+    def run():
+        buffer = Buffer(data)
+        for _ in range(100):
+            buffer.unpack_int()
+            buffer.unpack_long()
+            buffer.unpack_double()
+            buffer.unpack_bool()
+            buffer.unpack_string()
+            buffer.unpack_varint()
+
+    return run
+
+
+@benchmark("position.pack")
+def position_pack():
+    positions = [
+        (
+            random.randrange(-(2**25), 2**25),
+            random.randrange(-64, 320),
+            random.randrange(-(2**25), 2**25),
+        )
+        for _ in range(1000)
+    ]
+    return lambda: [Position.pack(position) for position in positions]
+
+
+@benchmark("position.unpack")
+def position_unpack():
+    data = b"".join(
+        Position.pack(
+            (random.randrange(-(2**25), 2**25), random.randrange(-64, 320), 0)
+        )
+        for _ in range(1000)
+    )
+    return lambda: [
+        Position.unpack(buffer) for buffer in [Buffer(data)] for _ in range(1000)
+    ]
+
+
+@benchmark("nbt.registry.parse")
+def nbt_registry_parse():
+    data = (ROOT / "registry_info.packet").read_bytes()
+    return lambda: nbt.Compound.from_buffer(Buffer(data), named=False, root_tag=True)
+
+
+@benchmark("nbt.registry.serialize")
+def nbt_registry_serialize():
+    data = (ROOT / "registry_info.packet").read_bytes()
+    compound = nbt.Compound.from_buffer(Buffer(data), named=False, root_tag=True)
+    return compound.to_bytes
+
+
+@benchmark("nbt.registry.lazy_lookup")
+def nbt_registry_lazy_lookup():
+    data = (ROOT / "registry_info.packet").read_bytes()
+    return lambda: nbt.LazyCompound(data, named=False).get(
+        "minecraft:dimension_type/value[0]/element/height"
+    )
+
+
+@benchmark("nbt.servers.parse")
+def nbt_servers_parse():
+    data = (ROOT / "servers.dat").read_bytes()
+    return lambda: nbt.Compound.from_buffer(Buffer(data), root_tag=True)
+
+
+@benchmark("nbt.servers.serialize")
+def nbt_servers_serialize():
+    data = (ROOT / "servers.dat").read_bytes()
+    return nbt.Compound.from_buffer(Buffer(data), root_tag=True).to_bytes
+
+
+@benchmark("compression.registry")
+def compression_registry():
+    payload = Login.registry_data.payload
+    return lambda: Compression().compress(payload)
+
+
+@benchmark("stage.play.movement")
+def stage_play_movement():
+    factory = ServerFactory(ServerStatus(max_players=20))
+    server, _ = join(factory)
+    packets = [
+        struct.pack(">Bddd?", 0x17, 1.5, 90.0, 2.5, True),
+        struct.pack(">Bdddff?", 0x18, 1.5, 90.0, 2.5, 90.0, 0.0, True),
+        struct.pack(">Bff?", 0x19, 90.0, 0.0, True),
+    ] * 100
+
+    def run():
+        for payload in packets:
+            server.state.process_packet(Packet(initial_bytes=payload))
+
+    return run
+
+
+@benchmark("pipeline.join")
+def pipeline_join():
+    factory = ServerFactory(ServerStatus(max_players=20))
+
+    def run():
+        server, _ = join(factory)
+        factory.ticker.tick()
+        server.connectionLost()
+
+    return run
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float | int]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [total / number for total in timer.repeat(repeat, number)]
+    return {
+        "best": min(timings),
+        "median": statistics.median(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "patterns", nargs="*", default=["*"], help="benchmark name globs"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="a previous JSON results file")
+    args = parser.parse_args()
+
+    Login.registry_data = load_registry_data(ROOT / "registry_info.packet")
+    Login.compression_threshold = -1
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else {}
+
+    results = dict()
+    for name, setup in benchmarks.items():
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in args.patterns):
+            continue
+
+        random.seed(args.seed)
+        result = results[name] = measure(setup(), args.repeat)
+
+        line = f"{name:<28} {result['best'] * 1e6:>12.2f}us"
+        if name in baseline:
+            line += f"  {baseline[name]['best'] / result['best']:>6.2f}x"
+        print(line)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "timestamp": time.time(),
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
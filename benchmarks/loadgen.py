@@ -0,0 +1,379 @@
+"""Opens simulated clients against a running server and reports how it copes.
+
+Start the server with ``--status-stats`` so the server tick time can be read from
+the status response, then run from the repository root::
+
+    python main.py --status-stats
+    python benchmarks/loadgen.py --clients 200 --join-rate 10 --output load.json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from twisted.internet import endpoints, protocol, reactor, task
+
+from src.compression import MAX_DATA_LENGTH, Compression
+from src.framing import FrameDecoder, FrameError
+from src.packets.packet import Packet, PacketWriter
+from src.tick import TICK_INTERVAL
+
+PROTOCOL_VERSION = 765
+WALK_SPEED = 4.317
+CHUNKS_PER_TICK = 9.0
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile, ``q`` between 0 and 100"""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def handshake(host: str, port: int, next_state: int) -> PacketWriter:
+    packet = PacketWriter(packet_id=0x00)
+    packet.pack_varint(PROTOCOL_VERSION)
+    packet.pack_string(host)
+    packet.pack_ushort(port)
+    packet.pack_varint(next_state)
+    return packet
+
+
+class Connection(protocol.Protocol):
+    """A client connection that splits and decompresses inbound packets"""
+
+    def __init__(self) -> None:
+        self.decoder = FrameDecoder()
+        self.compression: Compression | None = None
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def dataReceived(self, data: bytes) -> None:
+        self.bytes_received += len(data)
+        self.decoder.feed(data)
+        try:
+            for frame in self.decoder:
+                if self.compression is not None:
+                    frame = self.compression.unwrap(frame)
+
+                self.handle(Packet(initial_bytes=bytes(frame)))
+        except FrameError:
+            self.transport.loseConnection()
+
+    def send(self, *packets: PacketWriter) -> None:
+        frames = [packet.frame(self.compression) for packet in packets]
+        self.bytes_sent += sum(map(len, frames))
+        self.transport.writeSequence(frames)
+
+    def handle(self, packet: Packet) -> None:
+        raise NotImplementedError
+
+
+class Bot(Connection):
+    """Joins like a vanilla client, then walks around sending movement every tick"""
+
+    def __init__(self, run: "LoadRun", name: str) -> None:
+        super().__init__()
+        self.run = run
+        self.name = name
+        self.state = "login"
+        self.started = time.perf_counter()
+        self.joined: float | None = None
+        self.pos = [random.uniform(-32, 32), 90.0, random.uniform(-32, 32)]
+        self.yaw = random.uniform(0, 360)
+
+    def connectionMade(self) -> None:
+        start = PacketWriter(packet_id=0x00)
+        start.pack_string(self.name)
+        start.pack_uuid(uuid.uuid3(uuid.NAMESPACE_OID, self.name))
+        self.send(handshake(self.run.host, self.run.port, 2), start)
+
+    def connectionLost(self, reason=protocol.connectionDone) -> None:
+        self.run.disconnected(self)
+
+    def handle(self, packet: Packet) -> None:
+        handler = getattr(self, f"{self.state}_{packet.id:#04x}", None)
+        if handler is not None:
+            handler(packet)
+
+    def login_0x03(self, packet: Packet) -> None:
+        threshold = packet.unpack_varint()
+        if threshold >= 0:
+            self.compression = Compression(threshold, thread_cutoff=MAX_DATA_LENGTH)
+
+    def login_0x02(self, packet: Packet) -> None:
+        self.state = "configuration"
+        information = PacketWriter(packet_id=0x00)
+        information.pack_string("en_us")
+        information.pack_byte(10)
+        information.pack_varint(0)
+        information.pack_bool(True)
+        information.pack_ubyte(0x7F)
+        information.pack_varint(1)
+        information.pack_bool(False)
+        information.pack_bool(True)
+        self.send(PacketWriter(packet_id=0x03), information)
+
+    def configuration_0x02(self, packet: Packet) -> None:
+        self.state = "play"
+        self.send(PacketWriter(packet_id=0x02))
+
+    def configuration_0x03(self, packet: Packet) -> None:
+        response = PacketWriter(packet_id=0x03)
+        response.pack_long(packet.unpack_long())
+        self.send(response)
+
+    def play_0x29(self, packet: Packet) -> None:
+        self.joined = time.perf_counter()
+        self.run.joined(self)
+
+    def play_0x24(self, packet: Packet) -> None:
+        response = PacketWriter(packet_id=0x15)
+        response.pack_long(packet.unpack_long())
+        self.send(response)
+
+    def play_0x0c(self, packet: Packet) -> None:
+        received = PacketWriter(packet_id=0x07)
+        received.pack_float(CHUNKS_PER_TICK)
+        self.send(received)
+
+    def move(self, interval: float) -> None:
+        self.yaw = (self.yaw + random.uniform(-15, 15)) % 360
+        step = WALK_SPEED * interval
+        self.pos[0] -= math.sin(math.radians(self.yaw)) * step
+        self.pos[2] += math.cos(math.radians(self.yaw)) * step
+
+        movement = PacketWriter(packet_id=0x18)
+        movement.pack_double(self.pos[0])
+        movement.pack_double(self.pos[1])
+        movement.pack_double(self.pos[2])
+        movement.pack_float(self.yaw)
+        movement.pack_float(0.0)
+        movement.pack_bool(True)
+        self.send(movement)
+
+
+class StatusProbe(Connection):
+    """Reads the tick statistics the server publishes in its status response"""
+
+    def __init__(self, run: "LoadRun") -> None:
+        super().__init__()
+        self.run = run
+
+    def connectionMade(self) -> None:
+        self.send(
+            handshake(self.run.host, self.run.port, 1), PacketWriter(packet_id=0x00)
+        )
+
+    def handle(self, packet: Packet) -> None:
+        if packet.id == 0x00:
+            status = json.loads(packet.unpack_string())
+            self.run.tick_stats = status.get("devon", {}).get("tick")
+            self.transport.loseConnection()
+
+
+class LoadRun:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.host = args.host
+        self.port = args.port
+        self.endpoint = endpoints.TCP4ClientEndpoint(reactor, args.host, args.port)
+
+        self.bots: set[Bot] = set()
+        self.players: set[Bot] = set()
+        self.started = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latencies: list[float] = list()
+        self.tick_stats: dict | None = None
+        self.samples: list[dict] = list()
+        self.began = self.last_sample = time.perf_counter()
+        self.last_bytes = 0
+
+        self.spawner = task.LoopingCall(self.spawn)
+        self.mover = task.LoopingCall(self.move)
+        self.sampler = task.LoopingCall(self.sample)
+        self.finish_at: float | None = None
+
+    def start(self) -> None:
+        self.began = self.last_sample = time.perf_counter()
+        self.spawner.start(1 / self.args.join_rate)
+        self.mover.start(1 / self.args.move_rate, now=False)
+        self.sampler.start(self.args.sample_interval, now=False)
+        self.probe()
+
+    def spawn(self) -> None:
+        if self.started >= self.args.clients:
+            self.spawner.stop()
+            self.finish_at = time.perf_counter() + self.args.hold
+            return
+
+        bot = Bot(self, f"bot{self.started}")
+        self.started += 1
+        self.bots.add(bot)
+        connecting = endpoints.connectProtocol(self.endpoint, bot)
+        connecting.addErrback(self.connect_failed, bot)
+
+    def connect_failed(self, reason, bot: Bot) -> None:
+        self.failed += 1
+        self.bots.discard(bot)
+
+    def joined(self, bot: Bot) -> None:
+        self.players.add(bot)
+        self.latencies.append(bot.joined - bot.started)
+
+    def disconnected(self, bot: Bot) -> None:
+        if bot in self.bots:
+            self.dropped += 1
+            self.bots.discard(bot)
+            self.players.discard(bot)
+
+    def move(self) -> None:
+        for bot in self.players:
+            bot.move(1 / self.args.move_rate)
+
+    def probe(self) -> None:
+        connecting = endpoints.connectProtocol(self.endpoint, StatusProbe(self))
+        connecting.addErrback(lambda reason: None)
+
+    def sample(self) -> None:
+        now = time.perf_counter()
+        received = sum(bot.bytes_received for bot in self.bots)
+        elapsed = now - self.last_sample
+        players = len(self.players)
+
+        sample = {
+            "time": round(now - self.began, 1),
+            "players": players,
+            "joins": len(self.latencies),
+            "join_p50_ms": self.ms(percentile(self.latencies, 50)),
+            "join_p95_ms": self.ms(percentile(self.latencies, 95)),
+            "join_p99_ms": self.ms(percentile(self.latencies, 99)),
+            "tick": self.tick_stats,
+            "bytes_per_player_s": (
+                round((received - self.last_bytes) / elapsed / players)
+                if players
+                else None
+            ),
+        }
+        self.samples.append(sample)
+        self.report(sample)
+
+        self.latencies = list()
+        self.last_sample = now
+        self.last_bytes = received
+        self.probe()
+
+        if self.finish_at is not None and now >= self.finish_at:
+            self.stop()
+
+    @staticmethod
+    def ms(seconds: float | None) -> float | None:
+        return None if seconds is None else round(seconds * 1000, 2)
+
+    @staticmethod
+    def report(sample: dict) -> None:
+        tick = sample["tick"] or {}
+        value = lambda v, unit="ms": "-" if v is None else f"{v}{unit}"
+        print(
+            f"{sample['time']:>7}s {sample['players']:>5} players "
+            f"{sample['joins']:>4} joins "
+            f"join p50 {value(sample['join_p50_ms'])} "
+            f"p95 {value(sample['join_p95_ms'])} "
+            f"p99 {value(sample['join_p99_ms'])} "
+            f"tick {value(tick.get('mean_ms'))} max {value(tick.get('max_ms'))} "
+            f"{value(sample['bytes_per_player_s'], ' B/s')} per player"
+        )
+
+    def degradation(self) -> dict | None:
+        """The first sample where joins slowed down or the server fell behind"""
+        with_joins = [s for s in self.samples if s["join_p95_ms"] is not None]
+        if not with_joins:
+            return None
+
+        baseline = with_joins[0]["join_p95_ms"]
+        for sample in self.samples:
+            tick = sample["tick"] or {}
+            p95 = sample["join_p95_ms"]
+            if p95 is not None and p95 > baseline * self.args.degrade_factor:
+                return {"players": sample["players"], "reason": "join latency"}
+            if tick.get("mean_ms", 0) > TICK_INTERVAL * 1000:
+                return {"players": sample["players"], "reason": "tick time"}
+
+        return None
+
+    def stop(self) -> None:
+        for call in self.spawner, self.mover, self.sampler:
+            if call.running:
+                call.stop()
+
+        degradation = self.degradation()
+        print(f"{self.failed} connections failed, {self.dropped} dropped")
+        if degradation is None:
+            print("No degradation observed")
+        else:
+            players, reason = degradation["players"], degradation["reason"]
+            print(f"Degraded at {players} players ({reason})")
+
+        if self.args.output:
+            self.args.output.write_text(
+                json.dumps(
+                    {
+                        "clients": self.args.clients,
+                        "join_rate": self.args.join_rate,
+                        "move_rate": self.args.move_rate,
+                        "failed": self.failed,
+                        "dropped": self.dropped,
+                        "degradation": degradation,
+                        "samples": self.samples,
+                    },
+                    indent=2,
+                )
+            )
+
+        for bot in list(self.bots):
+            bot.transport.loseConnection()
+
+        reactor.callLater(0.5, reactor.stop)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25565)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument(
+        "--join-rate", type=float, default=10.0, help="joins per second"
+    )
+    parser.add_argument(
+        "--move-rate", type=float, default=20.0, help="movement packets per second"
+    )
+    parser.add_argument("--hold", type=float, default=30.0, help="seconds at full load")
+    parser.add_argument("--sample-interval", type=float, default=5.0)
+    parser.add_argument(
+        "--degrade-factor",
+        type=float,
+        default=2.0,
+        help="p95 join latency over the first sample that counts as degraded",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the samples as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    LoadRun(args).start()
+    reactor.run()
+
+
+if __name__ == "__main__":
+    main()
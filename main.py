@@ -1,11 +1,50 @@
-from twisted.internet import protocol, reactor, endpoints, task
+import argparse
+import collections
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+from twisted.internet import defer, protocol, endpoints
 from twisted.internet.interfaces import IAddress
+from twisted.python import failure, log
 
-from src import Buffer
-from src.packets import Packet
+from src.compression import DEFAULT_THRESHOLD
+from src.framing import FrameDecoder, FrameError
+from src.logs import configure_levels
+from src.metrics import listen_metrics, registry
+from src.packets import Packet, PacketWriter
+from src.packets.configuration import load_registry_data
 from src.player import Player
+from src.profiler import profiler
+from src.ratelimit import RateLimiter
 from src.stages import HandShake, Status, Login, Configuration, Play
-from src.structs import VarInt
+from src.stages.status import ServerStatus, load_favicon
+from src.tick import TPS, TickLoop, Timer
+from src.transport import Transport, install_asyncio_reactor, listen_asyncio
+from src.workers import PlayerCounts, Supervisor, listen_reuseport
+from src.world import (
+    AnvilSource,
+    BlockStates,
+    ChunkCache,
+    EntityTracker,
+    FlatGenerator,
+    RegionStorage,
+    TerrainGenerator,
+    World,
+)
+from src.world.world import CACHE_SIZE
+
+KEEPALIVE_INTERVAL = 15 * TPS
+KEEPALIVE_TIMEOUT = 30 * TPS
+LOGIN_TIMEOUT = 30 * TPS
+STATUS_RATE = 1.0
+STATUS_BURST = 10
+STATUS_STATS_INTERVAL = TPS
+
+logger = logging.getLogger("devon.network")
 
 
 class State:
@@ -26,37 +65,381 @@ STATES = {
 
 
 class Server(protocol.Protocol):
+    transport: Transport
+
     def __init__(self) -> None:
         self.player = Player(self)
         self.state = STATES[-1](self.player)
-        self.keepalive_loop = task.LoopingCall(self.keepalive)
+        self.decoder = FrameDecoder()
+        self.inflating: defer.Deferred | None = None
+        # abortConnection doesn't set the transport's disconnecting
+        self.closed = False
+
+        self.keepalive_id: int | None = None
+        self.keepalive_timer: Timer | None = None
+        self.timeout_timer: Timer | None = None
+        self.login_timer: Timer | None = None
+
+    def connectionMade(self) -> None:
+        self.player.connected()
+        ticker = self.factory.ticker
+        self.keepalive_timer = ticker.schedule(KEEPALIVE_INTERVAL, self.keepalive)
+        self.login_timer = ticker.schedule(LOGIN_TIMEOUT, self.timed_out)
 
     def keepalive(self) -> None:
-        keepalive = Packet(packet_id=0x24)
-        keepalive.pack_long(1)
-        self.send(keepalive)
+        ticker = self.factory.ticker
+        self.keepalive_timer = ticker.schedule(KEEPALIVE_INTERVAL, self.keepalive)
+
+        keepalive_id = int(time.time() * 1000)
+        packet = self.state.keep_alive(keepalive_id)
+        if packet is None or self.timeout_timer is not None:
+            return
+
+        self.keepalive_id = keepalive_id
+        self.timeout_timer = ticker.schedule(KEEPALIVE_TIMEOUT, self.timed_out)
+        self.send(packet)
+
+    def keepalive_received(self, keepalive_id: int) -> None:
+        if keepalive_id == self.keepalive_id and self.timeout_timer is not None:
+            self.timeout_timer.cancel()
+            self.timeout_timer = None
+
+    def timed_out(self) -> None:
+        self.player.close()
 
     def dataReceived(self, data: bytes) -> None:
-        buffer = Buffer(initial_bytes=data)
-        next_state = self.state.process_packet(
-            Packet(initial_bytes=buffer.read(buffer.unpack_varint()))
+        self.decoder.feed(data)
+        self.process_frames()
+
+    def process_frames(self) -> None:
+        try:
+            while (
+                self.inflating is None
+                and not self.closed
+                and not self.transport.disconnecting
+            ):
+                frame = self.decoder.next_frame()
+                if frame is None:
+                    break
+
+                compression = self.player.compression
+                payload = frame if compression is None else compression.unwrap(frame)
+                if isinstance(payload, defer.Deferred):
+                    self.inflating = payload
+                    self.transport.pauseProducing()
+                    payload.addCallbacks(self.inflated, self.inflate_failed)
+                    break
+
+                self.handle(payload)
+        except FrameError:
+            self.player.close()
+
+        if self.closed:
+            return
+
+        # answer everything read at once rather than wait for the tick
+        self.player.flush()
+
+    def inflated(self, payload: bytes) -> None:
+        self.inflating = None
+        self.handle(payload)
+        self.transport.resumeProducing()
+        self.process_frames()
+
+    def inflate_failed(self, reason: failure.Failure) -> None:
+        self.inflating = None
+        if not reason.check(FrameError):
+            logger.error(
+                "Failed to decompress an inbound packet: %s\n%s",
+                reason.getErrorMessage(),
+                self.player.trace.dump(),
+            )
+
+        self.player.close()
+
+    def handle(self, payload: bytes) -> None:
+        packet = Packet(initial_bytes=payload)
+        self.player.trace.record(
+            "in", type(self.state).__name__, packet.id, len(payload)
         )
 
+        try:
+            next_state = self.state.process_packet(packet)
+        except Exception:
+            logger.exception(
+                "Failed to handle a packet, recent packets:\n%s",
+                self.player.trace.dump(),
+            )
+            self.player.close()
+            return
+
         if next_state is not None:
             self.state = STATES[next_state](self.player)
 
-        next_packet = buffer.read()
-        if next_packet:
-            self.dataReceived(next_packet)
+            if next_state == State.CONFIGURATION:
+                self.login_timer.cancel()
+            elif next_state == State.STATUS and not self.status_allowed():
+                self.closed = True
+                self.transport.abortConnection()
 
-    def send(self, packet: Packet) -> None:
-        self.transport.write(VarInt.pack(len(packet.getvalue())) + packet.getvalue())
+    def status_allowed(self) -> bool:
+        return self.factory.status_limiter.allow(self.transport.getPeer().host)
+
+    def connectionLost(self, reason: failure.Failure = protocol.connectionDone) -> None:
+        self.closed = True
+        self.factory.connections.discard(self)
+        for timer in self.keepalive_timer, self.timeout_timer, self.login_timer:
+            if timer is not None:
+                timer.cancel()
+
+        self.player.disconnected()
+
+    def send(self, *packets: PacketWriter) -> None:
+        self.player.send(*packets)
 
 
 class ServerFactory(protocol.ServerFactory):
+    def __init__(
+        self,
+        status: ServerStatus,
+        status_stats: bool = False,
+        world: World | None = None,
+        status_metrics: bool = False,
+    ) -> None:
+        self.status = status
+        self.status_stats = status_stats
+        self.status_metrics = status_metrics
+        self.status_limiter = RateLimiter(STATUS_RATE, STATUS_BURST)
+        self.world = World(FlatGenerator()) if world is None else world
+        self.tracker = EntityTracker()
+        self.ticker = TickLoop()
+        self.ticker.add(self.tracker.tick)
+        self.ticker.add(self.world.tick)
+        self.ticker.add(self.flush, last=True)
+        self.connections: set[Server] = set()
+
+        registry.gauge(
+            "devon_connections",
+            "Open connections in each state",
+            ("state",),
+            self.connections_per_state,
+        )
+        registry.gauge(
+            "devon_outbound_queued_bytes",
+            "Bytes waiting in the outbound queues",
+            collect=self.queued_bytes,
+        )
+
+    def startFactory(self) -> None:
+        self.ticker.start()
+        if self.status_stats or self.status_metrics:
+            self.publish_stats()
+
+    def stopFactory(self) -> None:
+        self.ticker.stop()
+        self.world.close()
+
     def buildProtocol(self, addr: IAddress) -> protocol.Protocol | None:
-        return Server()
+        server = Server()
+        server.factory = self
+        self.connections.add(server)
+        return server
+
+    def flush(self) -> None:
+        """Writes what every connection queued during the tick"""
+        for server in self.connections:
+            server.player.flush()
+
+    def connections_per_state(self) -> dict[tuple[str], int]:
+        states = collections.Counter(
+            type(server.state).__name__ for server in self.connections
+        )
+        return {(state,): count for state, count in states.items()}
+
+    def queued_bytes(self) -> dict[tuple, int]:
+        return {
+            (): sum(
+                len(server.player.outbound)
+                for server in self.connections
+                if server.player.outbound is not None
+            )
+        }
+
+    def publish_stats(self) -> None:
+        """Adds the tick statistics, used for load testing, and the metrics to the
+        status response
+        """
+        extra = dict()
+        if self.status_stats:
+            extra["tick"] = self.ticker.stats()
+        if self.status_metrics:
+            extra["metrics"] = registry.summary()
+
+        self.status.extra = {"devon": extra}
+        self.ticker.schedule(STATUS_STATS_INTERVAL, self.publish_stats)
+
+    def dump_traces(self) -> None:
+        for server in self.connections:
+            logger.info(
+                "Recent packets of %s:\n%s",
+                server.transport.getPeer(),
+                server.player.trace.dump(),
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="A minecraft server written in python")
+    parser.add_argument("--port", type=int, default=25565)
+    parser.add_argument(
+        "--compression-threshold",
+        type=int,
+        default=DEFAULT_THRESHOLD,
+        help="smallest packet size to compress, -1 disables compression",
+    )
+    parser.add_argument(
+        "--log-level",
+        action="append",
+        default=[],
+        metavar="[NAME=]LEVEL",
+        help="log level for everything or for a stage or packet, e.g. play.0x17=DEBUG",
+    )
+    parser.add_argument("--max-players", type=int, default=69)
+    parser.add_argument("--motd", default="Puto el que lo lea")
+    parser.add_argument(
+        "--status-stats",
+        action="store_true",
+        help="include tick statistics in the status response",
+    )
+    parser.add_argument(
+        "--status-metrics",
+        action="store_true",
+        help="include the metric totals in the status response",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve Prometheus metrics on this local port, offset by the worker index",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="sample handlers and ticks from the start, SIGUSR2 toggles it and dumps",
+    )
+    parser.add_argument(
+        "--watchdog-ms",
+        type=float,
+        help="log the stack of a handler or tick running this long, also while not "
+        "profiling, profiling alone reports the ones over 50ms",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="terrain seed")
+    parser.add_argument("--flat", action="store_true", help="generate a flat world")
+    parser.add_argument(
+        "--region",
+        type=Path,
+        help="directory of .mca region files to load the world from",
+    )
+    parser.add_argument(
+        "--blocks",
+        type=Path,
+        help="blocks.json report of the vanilla data generator, to map saved blocks",
+    )
+    parser.add_argument(
+        "--generation-workers",
+        type=int,
+        help="processes generating chunks in each worker, 0 generates a few per tick "
+        "in the server process, by default half the CPUs shared between the workers",
+    )
+    parser.add_argument(
+        "--chunk-cache",
+        type=int,
+        default=CACHE_SIZE,
+        help="number of chunks kept in memory",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("twisted", "asyncio"),
+        default="twisted",
+        help="event loop to run on, asyncio uses uvloop when it is installed",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes sharing the port",
+    )
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--player-counts", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    logging.getLogger("devon").setLevel(logging.INFO)
+    configure_levels(args.log_level)
+    log.PythonLoggingObserver("devon.twisted").start()
+
+    if args.workers > 1 and args.worker is None:
+        Supervisor([sys.executable, __file__, *sys.argv[1:]], args.workers).run()
+        return
+
+    loop = None
+    if args.backend == "asyncio":
+        loop = install_asyncio_reactor()
+
+    from twisted.internet import reactor
+
+    counts = None
+    if args.worker is not None:
+        counts = PlayerCounts(args.player_counts, args.workers, args.worker)
+
+    root = Path(__file__).parent
+    Login.registry_data = load_registry_data(root / "registry_info.packet")
+    Login.compression_threshold = args.compression_threshold
+
+    generator = FlatGenerator() if args.flat else TerrainGenerator(args.seed)
+    if args.region is not None:
+        states = (
+            BlockStates()
+            if args.blocks is None
+            else BlockStates.from_report(args.blocks)
+        )
+        generator = AnvilSource(RegionStorage(args.region), states, generator)
+
+    generation_workers = args.generation_workers
+    if generation_workers is None:
+        generation_workers = max(1, (os.cpu_count() or 2) // 2 // args.workers)
+
+    world = World(generator, generation_workers, ChunkCache(args.chunk_cache))
+
+    factory = ServerFactory(
+        ServerStatus(
+            max_players=args.max_players,
+            motd=args.motd,
+            favicon=load_favicon(root / "server-icon.png"),
+            counts=counts,
+        ),
+        status_stats=args.status_stats,
+        world=world,
+        status_metrics=args.status_metrics,
+    )
+    signal.signal(
+        signal.SIGUSR1, lambda *_: reactor.callFromThread(factory.dump_traces)
+    )
+    signal.signal(signal.SIGUSR2, lambda *_: reactor.callFromThread(profiler.toggle))
+    if args.watchdog_ms is not None:
+        profiler.watch(args.watchdog_ms / 1000)
+    if args.profile:
+        profiler.start()
+
+    if args.metrics_port is not None:
+        listen_metrics(reactor, args.metrics_port + (args.worker or 0))
+
+    if loop is not None:
+        listen_asyncio(loop, factory, args.port, reuse_port=args.worker is not None)
+    elif args.worker is None:
+        endpoints.serverFromString(reactor, f"tcp:{args.port}").listen(factory)
+    else:
+        listen_reuseport(reactor, args.port, factory)
+    reactor.run()
 
 
-endpoints.serverFromString(reactor, "tcp:25565").listen(ServerFactory())
-reactor.run()
+if __name__ == "__main__":
+    main()
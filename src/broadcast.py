@@ -0,0 +1,46 @@
+from typing import TYPE_CHECKING, Iterable
+
+from twisted.internet import defer
+
+from src.packets.packet import PacketWriter, StaticPacket
+
+if TYPE_CHECKING:
+    from src.player import Player
+
+
+def broadcast(
+    packets: Iterable[PacketWriter | StaticPacket],
+    recipients: Iterable["Player"],
+    droppable: bool = False,
+) -> int:
+    """Sends ``packets`` to every recipient, encoding and framing them only once.
+
+    Recipients with the same compression threshold get the very same frames, using
+    the compressed form shared by the frozen packets. ``droppable`` packets, such as
+    movement updates, may be discarded for players that fall behind. Returns how
+    many players the packets were sent to.
+    """
+    frozen = [
+        packet if isinstance(packet, StaticPacket) else packet.freeze()
+        for packet in packets
+    ]
+    framed: dict[int | None, list[bytes | defer.Deferred]] = dict()
+
+    sent = 0
+    for player in recipients:
+        compression = player.compression
+        threshold = None if compression is None else compression.threshold
+
+        frames = framed.get(threshold)
+        if frames is None:
+            frames = [packet.frame(compression) for packet in frozen]
+            # a Deferred can only be waited on by one player, share bytes only
+            if all(isinstance(frame, bytes) for frame in frames):
+                framed[threshold] = frames
+
+        player.record(frozen)
+        player.write(frames, droppable)
+
+        sent += 1
+
+    return sent
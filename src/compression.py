@@ -0,0 +1,79 @@
+import zlib
+
+from twisted.internet import defer, threads
+
+from src.framing import FrameError
+from src.structs import VarInt
+
+DEFAULT_THRESHOLD = 256
+THREAD_CUTOFF = 16 * 1024
+MAX_DATA_LENGTH = 8 * 1024 * 1024
+
+
+class Compression:
+    """Frames packets in the compressed format negotiated with Set Compression.
+
+    zlib work on payloads of ``thread_cutoff`` bytes or more runs in the reactor's
+    thread pool and is returned as a Deferred.
+    """
+
+    def __init__(
+        self,
+        threshold: int = DEFAULT_THRESHOLD,
+        thread_cutoff: int = THREAD_CUTOFF,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+    ) -> None:
+        self.threshold = threshold
+        self.thread_cutoff = thread_cutoff
+        self.level = level
+
+    def compress(self, payload: bytes) -> bytes:
+        body = VarInt.pack(len(payload)) + zlib.compress(payload, self.level)
+        return VarInt.pack(len(body)) + body
+
+    def frame(self, payload: bytes) -> bytes | defer.Deferred:
+        if len(payload) < self.threshold:
+            return VarInt.pack(len(payload) + 1) + b"\x00" + payload
+
+        if len(payload) >= self.thread_cutoff:
+            return threads.deferToThread(self.compress, payload)
+
+        return self.compress(payload)
+
+    @staticmethod
+    def inflate(data: memoryview, data_length: int) -> bytes:
+        """Decompresses at most ``data_length`` bytes, a frame inflating to more is
+        rejected without decompressing the rest
+        """
+        decompressor = zlib.decompressobj()
+        try:
+            payload = decompressor.decompress(data, data_length)
+        except zlib.error as e:
+            raise FrameError(f"Invalid compressed frame: {e}")
+
+        if (
+            len(payload) != data_length
+            or decompressor.unconsumed_tail
+            or decompressor.unused_data
+            or not decompressor.eof
+        ):
+            raise FrameError("Compressed frame does not match its data length")
+
+        return payload
+
+    def unwrap(self, frame: memoryview) -> memoryview | bytes | defer.Deferred:
+        """The packet id and body inside an inbound compressed frame"""
+        data_length, offset = VarInt.unpack_from(frame, 0)
+        if data_length == 0:
+            return frame[offset:]
+
+        if data_length < self.threshold:
+            raise FrameError(f"Frame of {data_length} bytes should not be compressed")
+
+        if data_length > MAX_DATA_LENGTH:
+            raise FrameError(f"Compressed frame of {data_length} bytes is too big")
+
+        if data_length >= self.thread_cutoff:
+            return threads.deferToThread(self.inflate, frame[offset:], data_length)
+
+        return self.inflate(frame[offset:], data_length)
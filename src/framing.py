@@ -0,0 +1,68 @@
+from src.structs import VarInt
+
+MAX_FRAME_SIZE = 2097151
+MAX_LENGTH_BYTES = 3
+
+
+class FrameError(Exception):
+    pass
+
+
+class FrameDecoder:
+    """Accumulates bytes from a stream and splits them into length-prefixed frames.
+
+    Frames are handed out as memoryview slices over the accumulated bytes, so they
+    stay valid until they are released even after more data is fed.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE) -> None:
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def feed(self, data: bytes) -> None:
+        if self.offset:
+            # Frames may still reference the old buffer, so leave it untouched.
+            self.buffer = self.buffer[self.offset :] + data
+            self.offset = 0
+        else:
+            self.buffer += data
+
+    def read_length(self) -> tuple[int, int] | None:
+        try:
+            length, position = VarInt.unpack_from(self.buffer, self.offset)
+        except IndexError:
+            if len(self.buffer) - self.offset >= MAX_LENGTH_BYTES:
+                raise FrameError("Frame length prefix is too long")
+
+            return None
+        except ValueError:
+            raise FrameError("Frame length prefix is too long")
+
+        if position - self.offset > MAX_LENGTH_BYTES:
+            raise FrameError("Frame length prefix is too long")
+
+        return length, position
+
+    def next_frame(self) -> memoryview | None:
+        header = self.read_length()
+        if header is None:
+            return None
+
+        length, start = header
+        if length == 0:
+            raise FrameError("Empty frame")
+
+        if length > self.max_frame_size:
+            raise FrameError(f"Frame of {length} bytes exceeds {self.max_frame_size}")
+
+        end = start + length
+        if end > len(self.buffer):
+            return None
+
+        self.offset = end
+        return memoryview(self.buffer)[start:end]
+
+    def __iter__(self):
+        while (frame := self.next_frame()) is not None:
+            yield frame
@@ -0,0 +1,50 @@
+import collections
+import logging
+import time
+
+TRACE_SIZE = 64
+
+packet_loggers: dict[tuple[str, int | None], logging.Logger] = dict()
+
+
+def packet_logger(stage: str, packet_id: int | None) -> logging.Logger:
+    """The logger for one packet id of a stage, named like ``devon.play.0x17``.
+
+    Levels can be set for a whole stage (``devon.play``) or a single packet. Ids
+    without a listener share ``devon.<stage>.unknown``, ``packet_id`` is None for
+    them, so a client can't make the server create a logger for every id.
+    """
+    logger = packet_loggers.get((stage, packet_id))
+    if logger is None:
+        name = "unknown" if packet_id is None else f"{packet_id:#04x}"
+        logger = packet_loggers[stage, packet_id] = logging.getLogger(
+            f"devon.{stage.lower()}.{name}"
+        )
+
+    return logger
+
+
+def configure_levels(specs: list[str]) -> None:
+    """Applies ``name=LEVEL`` specs such as ``play=DEBUG`` or ``play.0x17=WARNING``"""
+    for spec in specs:
+        name, _, level = spec.rpartition("=")
+        logger_name = f"devon.{name.lower()}" if name else "devon"
+        logging.getLogger(logger_name).setLevel(level.upper())
+
+
+class PacketTrace:
+    """A ring buffer with the headers of the last packets of a connection"""
+
+    def __init__(self, size: int = TRACE_SIZE) -> None:
+        self.entries: collections.deque[tuple[float, str, str, int, int]] = (
+            collections.deque(maxlen=size)
+        )
+
+    def record(self, direction: str, stage: str, packet_id: int, size: int) -> None:
+        self.entries.append((time.time(), direction, stage, packet_id, size))
+
+    def dump(self) -> str:
+        return "\n".join(
+            f"{timestamp:.3f} {direction:>3} {stage:<13} {packet_id:#04x} {size}B"
+            for timestamp, direction, stage, packet_id, size in self.entries
+        )
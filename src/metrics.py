@@ -0,0 +1,273 @@
+import abc
+import bisect
+import logging
+from typing import Any, Callable
+
+from twisted.internet import endpoints
+from twisted.internet.interfaces import IReactorTCP
+from twisted.web import resource, server
+
+CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+HANDLER_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+TICK_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = tuple(2**i for i in range(8, 25, 2))
+
+Labels = tuple[Any, ...]
+
+logger = logging.getLogger("devon.metrics")
+
+
+def format_labels(names: tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{value if isinstance(value, str) else f"{value:#04x}"}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(abc.ABC):
+    """A family of samples with the same name, one for each set of label values.
+
+    Label values are kept as given and only formatted when exported, integers, which
+    are packet ids, in hex. Metrics are only updated from the reactor thread, so
+    they are plain dict updates without any locking.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+
+    @abc.abstractmethod
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def total(self) -> Any:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, description, labels)
+        self.values: dict[Labels, float] = dict()
+        if not labels:
+            self.values[()] = 0
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{format_labels(self.labels, labels)} {value}"
+            for labels, value in self.values.items()
+        ]
+
+    def total(self) -> Any:
+        return sum(self.values.values())
+
+
+class Gauge(Counter):
+    """A value read when the metrics are exported, from ``collect`` if it has one"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[Labels, float]] | None = None,
+    ):
+        super().__init__(name, description, labels)
+        self.collect = collect
+
+    def set(self, labels: Labels = (), value: float = 0) -> None:
+        self.values[labels] = value
+
+    def samples(self) -> list[str]:
+        if self.collect is not None:
+            self.values = self.collect()
+
+        return super().samples()
+
+    def total(self) -> Any:
+        if self.collect is not None:
+            self.values = self.collect()
+
+        return super().total()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = HANDLER_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+        # per labels, the count of every bucket and of +Inf, then the sum
+        self.values: dict[Labels, list[float]] = dict()
+        if not labels:
+            self.values[()] = [0] * (len(buckets) + 2)
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> list[str]:
+        lines = list()
+        for labels, counts in self.values.items():
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                total += count
+                label_text = format_labels(self.labels, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{label_text} {total}")
+
+            label_text = format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {counts[-1]}")
+            lines.append(f"{self.name}_count{label_text} {total}")
+
+        return lines
+
+    def total(self) -> Any:
+        return {
+            "count": sum(sum(counts[:-1]) for counts in self.values.values()),
+            "sum": sum(counts[-1] for counts in self.values.values()),
+        }
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = dict()
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds ``metric``, replacing any other with the same name"""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels=()) -> Counter:
+        return self.register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels=(), collect=None) -> Gauge:
+        return self.register(Gauge(name, description, labels, collect))
+
+    def histogram(self, name: str, description: str, labels=(), **kwargs) -> Histogram:
+        return self.register(Histogram(name, description, labels, **kwargs))
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text format"""
+        lines = list()
+        for metric in self.metrics.values():
+            lines += metric.render()
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict[str, Any]:
+        """Every metric summed over its labels, so the size doesn't depend on what
+        clients send, small enough for the status response
+        """
+        return {
+            name.removeprefix("devon_"): metric.total()
+            for name, metric in self.metrics.items()
+        }
+
+
+registry = Registry()
+
+packets_received = registry.counter(
+    "devon_packets_received_total", "Packets received", ("stage", "packet_id")
+)
+bytes_received = registry.counter(
+    "devon_bytes_received_total",
+    "Uncompressed bytes of the packets received",
+    ("stage", "packet_id"),
+)
+packets_sent = registry.counter(
+    "devon_packets_sent_total", "Packets sent", ("stage", "packet_id")
+)
+bytes_sent = registry.counter(
+    "devon_bytes_sent_total",
+    "Uncompressed bytes of the packets sent",
+    ("stage", "packet_id"),
+)
+handler_seconds = registry.histogram(
+    "devon_handler_seconds",
+    "Time spent handling a packet",
+    ("stage", "packet_id"),
+    buckets=HANDLER_BUCKETS,
+)
+tick_seconds = registry.histogram(
+    "devon_tick_seconds", "Duration of a tick", buckets=TICK_BUCKETS
+)
+flush_bytes = registry.histogram(
+    "devon_outbound_flush_bytes",
+    "Bytes queued for a connection when it is flushed",
+    buckets=SIZE_BUCKETS,
+)
+bytes_written = registry.counter(
+    "devon_bytes_written_total", "Bytes written to connections"
+)
+frames_dropped = registry.counter(
+    "devon_outbound_dropped_frames_total",
+    "Droppable frames discarded for lagging connections",
+)
+lagging_disconnects = registry.counter(
+    "devon_outbound_disconnects_total",
+    "Connections aborted for having too much queued",
+)
+
+
+class MetricsResource(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, metrics: Registry = registry) -> None:
+        super().__init__()
+        self.metrics = metrics
+
+    def render_GET(self, request: server.Request) -> bytes:
+        request.setHeader(b"Content-Type", CONTENT_TYPE)
+        return self.metrics.render().encode()
+
+
+def listen_metrics(reactor: IReactorTCP, port: int, interface: str = "127.0.0.1"):
+    """Serves the metrics in the Prometheus text format over HTTP"""
+    logger.info("Serving metrics on http://%s:%d/metrics", interface, port)
+    endpoint = endpoints.TCP4ServerEndpoint(reactor, port, interface=interface)
+    return endpoint.listen(server.Site(MetricsResource()))
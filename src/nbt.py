@@ -1,5 +1,8 @@
 import abc
+import re
 import struct
+import sys
+from array import array
 from typing import Any, ClassVar
 
 from src.buffer import Buffer
@@ -23,11 +26,27 @@ class Tag(metaclass=abc.ABCMeta):
 
     def to_bytes(self) -> bytes:
         """Returns bytes representing the full tag with name and id"""
-        return self.pack(self.id, self.get_value())
+        out = bytearray()
+        self.write_tag(out)
+        return bytes(out)
 
-    @abc.abstractmethod
     def get_value(self) -> bytes:
         """Returns bytes representing just the value of the object, nameless and ID-less"""
+        out = bytearray()
+        self.write(out)
+        return bytes(out)
+
+    def write_tag(self, out: bytearray) -> None:
+        """Appends the full tag with name and id to ``out``"""
+        out.append(self.id)
+        if self.name is not None:
+            out += self.pack_string(self.name)
+
+        self.write(out)
+
+    @abc.abstractmethod
+    def write(self, out: bytearray) -> None:
+        """Appends just the value of the object, nameless and ID-less, to ``out``"""
         raise NotImplementedError
 
     @classmethod
@@ -48,10 +67,6 @@ class Tag(metaclass=abc.ABCMeta):
     def unpack_string(buffer: Buffer) -> str:
         return buffer.read(buffer.unpack_ushort()).decode("utf-8")
 
-    def pack(self, tag_id: int, tag_data: bytes) -> bytes:
-        name = self.pack_string(self.name) if self.name is not None else b""
-        return self.pack_id(tag_id) + name + tag_data
-
     @staticmethod
     def pack_id(tag_id: int) -> bytes:
         return struct.pack("b", tag_id)
@@ -64,8 +79,8 @@ class StructTag(Tag):
             + f"TAG_{type(self).__name__}({repr(self.name)}) {repr(self.value)}"
         )
 
-    def get_value(self) -> bytes:
-        return struct.pack(self.fmt, self.value)
+    def write(self, out: bytearray) -> None:
+        out += struct.pack(self.fmt, self.value)
 
     @classmethod
     def from_buffer(cls, buffer: Buffer, *, named: bool = True):
@@ -74,6 +89,8 @@ class StructTag(Tag):
 
 
 class ArrayTag(Tag):
+    typecode: ClassVar[str]
+
     def tostring(self, indent: int = 0) -> str:
         inner_tags = "\n".join([tag.tostring(indent + 2) for tag in self.value])
 
@@ -85,23 +102,22 @@ class ArrayTag(Tag):
             + "}"
         )
 
-    def get_value(self) -> bytes:
-        length = struct.pack(">i", len(self.value))
-        array = b""
-
-        for element in self.value:
-            array += struct.pack(self.fmt, element.get_value())
+    def write(self, out: bytearray) -> None:
+        values = array(self.typecode, self.value)
+        if sys.byteorder == "little":
+            values.byteswap()
 
-        encoded_array = length + array
-        return encoded_array
+        out += struct.pack(">i", len(values))
+        out += values
 
     @classmethod
     def from_buffer(cls, buffer: Buffer, *, named: bool = True):
         name = Tag.unpack_string(buffer) if named else None
 
-        value = []
-        for _ in range(buffer.unpack_int()):
-            value.append(buffer.unpack(cls.fmt))
+        value = array(cls.typecode)
+        value.frombytes(buffer.read(buffer.unpack_int() * value.itemsize))
+        if sys.byteorder == "little":
+            value.byteswap()
 
         return cls(name, value)
 
@@ -139,6 +155,7 @@ class Double(StructTag):
 class ByteArray(ArrayTag):
     id = 7
     fmt = "b"
+    typecode = "b"
 
 
 class String(ArrayTag):
@@ -150,8 +167,8 @@ class String(ArrayTag):
             + f"TAG_{type(self).__name__}({repr(self.name)}) {repr(self.value)}"
         )
 
-    def get_value(self) -> bytes:
-        return self.pack_string(self.value)
+    def write(self, out: bytearray) -> None:
+        out += self.pack_string(self.value)
 
     @classmethod
     def from_buffer(cls, buffer: Buffer, *, named: bool = True):
@@ -168,13 +185,10 @@ class List(ArrayTag):
         self.type = _type
         super().__init__(name, value)
 
-    def get_value(self) -> bytes:
-        encoded_list = self.pack_id(self.type)
-        encoded_list += struct.pack(">I", len(self.value))
+    def write(self, out: bytearray) -> None:
+        out += struct.pack(">bi", self.type, len(self.value))
         for element in self.value:
-            encoded_list += element.get_value()
-
-        return encoded_list
+            element.write(out)
 
     @classmethod
     def from_buffer(cls, buffer: Buffer, *, named: bool = True):
@@ -196,12 +210,18 @@ class Compound(ArrayTag):
     id = 10
     value: list[Tag]
 
-    def get_value(self) -> bytes:
-        compound = b""
+    def get(self, name: str) -> Tag | None:
+        for tag in self.value:
+            if tag.name == name:
+                return tag
+
+        return None
+
+    def write(self, out: bytearray) -> None:
         for element in self.value:
-            compound += element.to_bytes()
+            element.write_tag(out)
 
-        return compound + b"\x00"
+        out.append(0)
 
     @classmethod
     def from_bytes(cls, b: bytes, named: bool = True, root_tag: bool = False):
@@ -228,11 +248,13 @@ class Compound(ArrayTag):
 class IntArray(ArrayTag):
     id = 11
     fmt = ">i"
+    typecode = "i"
 
 
 class LongArray(ArrayTag):
     id = 12
     fmt = ">q"
+    typecode = "q"
 
 
 tag_ids.update(
@@ -251,3 +273,139 @@ tag_ids.update(
         12: LongArray,
     }
 )
+
+
+fixed_sizes = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+array_sizes = {7: 1, 11: 4, 12: 8}
+path_part = re.compile(r"([^\[\]]*)((?:\[\d+])*)")
+
+
+def split_part(path: str, part: str) -> tuple[str, str]:
+    """The name and list indexes of one part of ``path``"""
+    match = path_part.fullmatch(part)
+    if match is None:
+        raise KeyError(f"{path}: malformed part {part!r}")
+
+    return match.group(1), match.group(2)
+
+
+class IndexEntry:
+    __slots__ = ("id", "header", "start", "end", "children")
+
+    def __init__(
+        self,
+        tag_id: int,
+        header: int,
+        start: int,
+        end: int,
+        children: dict[str, "IndexEntry"] | list["IndexEntry"] | None = None,
+    ) -> None:
+        self.id = tag_id
+        self.header = header
+        self.start = start
+        self.end = end
+        self.children = children
+
+
+class LazyCompound:
+    """An NBT compound that is indexed by offset once and decoded only where it is read.
+
+    Paths look like ``minecraft:dimension_type/value[0]/element/height``.
+    """
+
+    def __init__(
+        self, data: bytes, *, named: bool = True, root_tag: bool = True
+    ) -> None:
+        self.data = memoryview(data)
+
+        offset = 1 if root_tag else 0
+        if named:
+            offset += 2 + struct.unpack_from(">H", self.data, offset)[0]
+
+        self.root = self.scan(Compound.id, 0, offset)
+
+    def scan(self, tag_id: int, header: int, offset: int) -> IndexEntry:
+        data = self.data
+
+        if tag_id in fixed_sizes:
+            return IndexEntry(tag_id, header, offset, offset + fixed_sizes[tag_id])
+
+        if tag_id in array_sizes:
+            length = struct.unpack_from(">i", data, offset)[0]
+            end = offset + 4 + length * array_sizes[tag_id]
+            return IndexEntry(tag_id, header, offset, end)
+
+        if tag_id == String.id:
+            end = offset + 2 + struct.unpack_from(">H", data, offset)[0]
+            return IndexEntry(tag_id, header, offset, end)
+
+        if tag_id == List.id:
+            element_id, length = struct.unpack_from(">bi", data, offset)
+            position = offset + 5
+            elements = list()
+            for _ in range(length):
+                element = self.scan(element_id, position, position)
+                elements.append(element)
+                position = element.end
+
+            return IndexEntry(tag_id, header, offset, position, elements)
+
+        if tag_id == Compound.id:
+            position = offset
+            members = dict()
+            while (member_id := data[position]) != 0:
+                name_length = struct.unpack_from(">H", data, position + 1)[0]
+                name_end = position + 3 + name_length
+                name = str(data[position + 3 : name_end], "utf-8")
+
+                member = self.scan(member_id, position, name_end)
+                members[name] = member
+                position = member.end
+
+            return IndexEntry(tag_id, header, offset, position + 1, members)
+
+        raise ValueError(f"Unknown tag id {tag_id}")
+
+    def find(self, path: str) -> IndexEntry:
+        entry = self.root
+        parts = path.split("/")
+        while parts:
+            part = parts.pop(0)
+            name, indexes = split_part(path, part)
+            if name:
+                if entry.id != Compound.id:
+                    raise KeyError(f"{path}: {name!r} is not inside a compound")
+
+                # Names such as "minecraft:worldgen/biome" contain the separator.
+                while name not in entry.children and parts:
+                    part += "/" + parts.pop(0)
+                    name, indexes = split_part(path, part)
+
+                entry = entry.children[name]
+
+            for index in re.findall(r"\d+", indexes):
+                if entry.id != List.id:
+                    raise KeyError(f"{path}: [{index}] is not inside a list")
+
+                entry = entry.children[int(index)]
+
+        return entry
+
+    def get(self, path: str) -> Tag:
+        """Decodes the tag at ``path``"""
+        entry = self.find(path)
+        value = self.data[entry.start : entry.end]
+        return tag_ids[entry.id].from_buffer(Buffer(value), named=False)
+
+    def raw(self, path: str, *, header: bool = False) -> memoryview:
+        """The encoded tag at ``path``, with its id and name if ``header`` is set"""
+        entry = self.find(path)
+        return self.data[entry.header if header else entry.start : entry.end]
+
+    def __contains__(self, path: str) -> bool:
+        try:
+            self.find(path)
+        except (KeyError, IndexError):
+            return False
+
+        return True
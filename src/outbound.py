@@ -0,0 +1,112 @@
+import logging
+
+from twisted.internet.interfaces import IPushProducer
+from zope.interface import implementer
+
+from src.metrics import bytes_written, flush_bytes, frames_dropped
+from src.metrics import lagging_disconnects
+from src.transport import Transport
+
+DROP_THRESHOLD = 1024 * 1024
+MAX_QUEUED = 8 * 1024 * 1024
+
+logger = logging.getLogger("devon.network")
+
+
+@implementer(IPushProducer)
+class OutboundQueue:
+    """Frames waiting to be sent to one connection, written as a single
+    ``writeSequence`` when flushed.
+
+    The queue is registered as the transport's producer, so while the transport has
+    more buffered than it wants it is paused and frames wait here instead. Once more
+    than ``drop_threshold`` bytes wait, droppable frames such as movement updates are
+    discarded, and a connection with more than ``limit`` bytes waiting is aborted.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        drop_threshold: int = DROP_THRESHOLD,
+        limit: int = MAX_QUEUED,
+    ) -> None:
+        self.transport = transport
+        self.drop_threshold = drop_threshold
+        self.limit = limit
+
+        self.frames: list[bytes] = list()
+        self.droppable: list[bool] = list()
+        self.size = 0
+        self.paused = False
+        self.closed = False
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, frames: list[bytes], droppable: bool = False) -> None:
+        if self.closed:
+            return
+
+        size = sum(map(len, frames))
+        if self.size + size > self.drop_threshold:
+            if droppable:
+                self.dropped += len(frames)
+                frames_dropped.inc((), len(frames))
+                return
+
+            self.drop()
+
+        if self.size + size > self.limit:
+            logger.warning(
+                "Disconnecting %s, %d bytes are waiting to be sent",
+                self.transport.getPeer(),
+                self.size + size,
+            )
+            lagging_disconnects.inc()
+            self.stopProducing()
+            self.transport.abortConnection()
+            return
+
+        self.frames += frames
+        self.droppable += [droppable] * len(frames)
+        self.size += size
+
+    def drop(self) -> None:
+        """Discards the droppable frames still waiting"""
+        kept = [
+            frame
+            for frame, droppable in zip(self.frames, self.droppable)
+            if not droppable
+        ]
+        self.dropped += len(self.frames) - len(kept)
+        frames_dropped.inc((), len(self.frames) - len(kept))
+        self.frames = kept
+        self.droppable = [False] * len(kept)
+        self.size = sum(map(len, kept))
+
+    def flush(self, force: bool = False) -> None:
+        if not self.frames or self.closed or (self.paused and not force):
+            return
+
+        frames = self.frames
+        flush_bytes.observe((), self.size)
+        bytes_written.inc((), self.size)
+
+        self.frames = list()
+        self.droppable = list()
+        self.size = 0
+        self.transport.writeSequence(frames)
+
+    def pauseProducing(self) -> None:
+        self.paused = True
+
+    def resumeProducing(self) -> None:
+        self.paused = False
+        self.flush()
+
+    def stopProducing(self) -> None:
+        self.closed = True
+        self.frames = list()
+        self.droppable = list()
+        self.size = 0
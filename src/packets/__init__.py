@@ -1 +1 @@
-from src.packets.packet import Packet
\ No newline at end of file
+from src.packets.packet import Packet, PacketWriter, StaticPacket
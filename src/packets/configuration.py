@@ -0,0 +1,34 @@
+import mmap
+import os
+
+from src import nbt
+from src.buffer import Buffer
+from src.packets.packet import StaticPacket
+from src.packets.template import PacketTemplate
+from src.structs import Long
+
+
+class FinishConfiguration(PacketTemplate, packet_id=0x02):
+    pass
+
+
+class KeepAlive(PacketTemplate, packet_id=0x03):
+    keep_alive_id: Long
+
+
+FINISH_CONFIGURATION = FinishConfiguration.frozen
+
+keep_alive = KeepAlive.build
+
+
+def load_registry_data(path: str | os.PathLike) -> StaticPacket:
+    """Loads and validates the registry NBT sent to every player during configuration"""
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        buffer = Buffer(data)
+        nbt.Compound.from_buffer(buffer, named=False, root_tag=True)
+        if buffer.tell() != len(data):
+            raise ValueError(f"{path} has trailing data after the registry compound")
+
+        return StaticPacket.from_body(0x05, data)
@@ -0,0 +1,15 @@
+from src.packets.template import PacketTemplate
+from src.structs import String, UUID, VarInt
+
+
+class SetCompression(PacketTemplate, packet_id=0x03):
+    threshold: VarInt
+
+
+class LoginSuccess(PacketTemplate, packet_id=0x02):
+    uuid: UUID
+    username: String
+    properties: VarInt = 0
+
+
+set_compression = SetCompression.build
@@ -1,8 +1,11 @@
 from typing import Self
 
-from twisted.internet.protocol import Protocol
+from twisted.internet.defer import Deferred
+from twisted.python.failure import Failure
 
-from src.buffer import Buffer
+from src.buffer import Buffer, WriteBuffer
+from src.compression import Compression
+from src.framing import MAX_LENGTH_BYTES
 from src.structs import VarInt
 
 
@@ -19,6 +22,107 @@ class Packet(Buffer):
             self.id = packet_id
             self.pack_varint(packet_id)
 
-    def print(self) -> None:
-        print(self.getvalue())
-        print("".join([f"{x:02x} " for x in self.getvalue()]))
+
+class PacketWriter(WriteBuffer):
+    """An outbound packet that keeps room for its length prefix in front of the id.
+
+    ``frame`` writes the prefix into the reserved space, so the framed packet is
+    produced in a single copy of the body. One extra byte is reserved for the data
+    length of uncompressed packets once compression is enabled.
+    """
+
+    header_size = MAX_LENGTH_BYTES + 1
+
+    def __init__(self, *, packet_id: int) -> None:
+        super().__init__()
+
+        self.id = packet_id
+        self.data += bytes(self.header_size)
+        self.data += VarInt.pack(packet_id)
+
+    def __len__(self) -> int:
+        return len(self.data) - self.header_size
+
+    def getvalue(self) -> bytes:
+        return bytes(self.payload())
+
+    def payload(self) -> memoryview:
+        """The packet id and body, without the length prefix"""
+        return memoryview(self.data)[self.header_size :]
+
+    def freeze(self) -> "StaticPacket":
+        return StaticPacket(bytes(self.payload()))
+
+    def frame(self, compression: Compression = None) -> bytes | Deferred:
+        size = len(self.data) - self.header_size
+        if compression is None:
+            prefix = VarInt.pack(size)
+        elif size < compression.threshold:
+            prefix = VarInt.pack(size + 1) + b"\x00"
+        else:
+            return compression.frame(self.payload())
+
+        if len(prefix) > self.header_size:
+            raise ValueError(f"Packet {hex(self.id)} is too big to be framed")
+
+        start = self.header_size - len(prefix)
+        self.data[start : self.header_size] = prefix
+
+        return bytes(memoryview(self.data)[start:])
+
+
+class StaticPacket:
+    """An immutable packet framed once and shared between every player it is sent to"""
+
+    def __init__(self, payload: bytes) -> None:
+        self.id = VarInt.unpack_from(payload, 0)[0]
+        self.payload = payload
+        self.framed = VarInt.pack(len(payload)) + payload
+        self.compressed: dict[int, bytes] = dict()
+        # the callers waiting for a compression running in a thread, per threshold
+        self.compressing: dict[int, list[Deferred]] = dict()
+
+    def __len__(self) -> int:
+        return len(self.payload)
+
+    @classmethod
+    def from_body(cls, packet_id: int, body: bytes) -> Self:
+        return cls(VarInt.pack(packet_id) + body)
+
+    def frame(self, compression: Compression = None) -> bytes | Deferred:
+        """The framed packet, compressed once per threshold and shared afterwards.
+
+        While it is being compressed every caller gets its own Deferred, fired with
+        the frame or the failure once the compression is done.
+        """
+        if compression is None:
+            return self.framed
+
+        threshold = compression.threshold
+        framed = self.compressed.get(threshold)
+        if framed is not None:
+            return framed
+
+        waiter = Deferred()
+        waiting = self.compressing.get(threshold)
+        if waiting is not None:
+            waiting.append(waiter)
+            return waiter
+
+        framed = compression.frame(self.payload)
+        if isinstance(framed, bytes):
+            self.compressed[threshold] = framed
+            return framed
+
+        # the waiter is registered first, the compression may have finished already
+        self.compressing[threshold] = [waiter]
+        framed.addBoth(self.compressed_done, threshold)
+        return waiter
+
+    def compressed_done(self, result: bytes | Failure, threshold: int) -> None:
+        # a failure isn't cached, the next caller compresses again
+        if not isinstance(result, Failure):
+            self.compressed[threshold] = result
+
+        for waiter in self.compressing.pop(threshold):
+            waiter.callback(result)
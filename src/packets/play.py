@@ -0,0 +1,198 @@
+import uuid
+
+from src import nbt
+from src.packets.packet import PacketWriter
+from src.packets.template import PacketTemplate
+from src.structs import (
+    Array,
+    Boolean,
+    Byte,
+    Bytes,
+    Double,
+    Float,
+    Int,
+    Long,
+    Raw,
+    Short,
+    String,
+    UByte,
+    UUID,
+    VarInt,
+)
+
+PLAYER_ENTITY_TYPE = 124
+
+
+class LoginPlay(PacketTemplate, packet_id=0x29):
+    entity_id: Int
+    is_hardcore: Boolean = False
+    dimension_names: Array[String] = (
+        "minecraft:overworld",
+        "minecraft:overworld_caves",
+        "minecraft:the_nether",
+        "minecraft:the_end",
+    )
+    max_players: VarInt = 20
+    view_distance: VarInt = 10
+    simulation_distance: VarInt = 8
+    reduced_debug_info: Boolean = False
+    enable_respawn_screen: Boolean = False
+    do_limited_crafting: Boolean = False
+    dimension_type: String = "minecraft:overworld"
+    dimension_name: String = "overworld"
+    hashed_seed: Long = 0
+    game_mode: UByte = 1
+    previous_game_mode: Byte = -1
+    is_debug: Boolean = False
+    is_flat: Boolean = False
+    has_death_location: Boolean = False
+    portal_cooldown: VarInt = 0
+
+
+class GameEvent(PacketTemplate, packet_id=0x20):
+    event: UByte
+    value: Float
+
+
+class KeepAlive(PacketTemplate, packet_id=0x24):
+    keep_alive_id: Long
+
+
+class ChunkBatchStart(PacketTemplate, packet_id=0x0D):
+    pass
+
+
+class ChunkBatchFinished(PacketTemplate, packet_id=0x0C):
+    batch_size: VarInt
+
+
+class UnloadChunk(PacketTemplate, packet_id=0x1F):
+    z: Int
+    x: Int
+
+
+class SetCenterChunk(PacketTemplate, packet_id=0x52):
+    x: VarInt
+    z: VarInt
+
+
+class ChunkData(PacketTemplate, packet_id=0x25):
+    x: Int
+    z: Int
+    heightmaps: Raw = nbt.Compound(None, []).to_bytes()
+    data: Bytes
+    block_entities: VarInt = 0
+    # sky light, block light, empty sky light and empty block light masks
+    sky_light_mask: VarInt = 0
+    block_light_mask: VarInt = 0
+    empty_sky_light_mask: VarInt = 0
+    empty_block_light_mask: VarInt = 0
+    sky_light_arrays: VarInt = 0
+    block_light_arrays: VarInt = 0
+
+
+class SpawnEntity(PacketTemplate, packet_id=0x01):
+    entity_id: VarInt
+    entity_uuid: UUID
+    entity_type: VarInt
+    x: Double
+    y: Double
+    z: Double
+    pitch: UByte
+    yaw: UByte
+    head_yaw: UByte
+    data: VarInt = 0
+    velocity_x: Short = 0
+    velocity_y: Short = 0
+    velocity_z: Short = 0
+
+
+class PlayerInfoUpdate(PacketTemplate, packet_id=0x3C):
+    """Adds a single player to the client's player list, without listing it"""
+
+    actions: Byte = 0x01
+    players: VarInt = 1
+    player_uuid: UUID
+    name: String
+    properties: VarInt = 0
+
+
+class PlayerInfoRemove(PacketTemplate, packet_id=0x3B):
+    uuids: Array[UUID]
+
+
+class RemoveEntities(PacketTemplate, packet_id=0x40):
+    entity_ids: Array[VarInt]
+
+
+class TeleportEntity(PacketTemplate, packet_id=0x6B):
+    entity_id: VarInt
+    x: Double
+    y: Double
+    z: Double
+    yaw: UByte
+    pitch: UByte
+    on_ground: Boolean
+
+
+class SetHeadRotation(PacketTemplate, packet_id=0x46):
+    entity_id: VarInt
+    head_yaw: UByte
+
+
+START_WAITING_FOR_CHUNKS = GameEvent.build(13, 0.0).freeze()
+CHUNK_BATCH_START = ChunkBatchStart.frozen
+
+login_play = LoginPlay.build
+keep_alive = KeepAlive.build
+chunk_batch_finished = ChunkBatchFinished.build
+set_center_chunk = SetCenterChunk.build
+add_player_info = PlayerInfoUpdate.build
+remove_player_info = PlayerInfoRemove.build
+remove_entities = RemoveEntities.build
+
+
+def unload_chunk(x: int, z: int) -> PacketWriter:
+    return UnloadChunk.build(x=x, z=z)
+
+
+def angle(degrees: float) -> int:
+    return int(degrees * 256 / 360) & 0xFF
+
+
+def spawn_player(
+    entity_id: int,
+    player_uuid: uuid.UUID,
+    x: float,
+    y: float,
+    z: float,
+    yaw: float,
+    pitch: float,
+) -> PacketWriter:
+    return SpawnEntity.build(
+        entity_id,
+        player_uuid,
+        PLAYER_ENTITY_TYPE,
+        x,
+        y,
+        z,
+        angle(pitch),
+        angle(yaw),
+        angle(yaw),
+    )
+
+
+def teleport_entity(
+    entity_id: int,
+    x: float,
+    y: float,
+    z: float,
+    yaw: float,
+    pitch: float,
+    on_ground: bool,
+) -> PacketWriter:
+    return TeleportEntity.build(entity_id, x, y, z, angle(yaw), angle(pitch), on_ground)
+
+
+def set_head_rotation(entity_id: int, yaw: float) -> PacketWriter:
+    return SetHeadRotation.build(entity_id, angle(yaw))
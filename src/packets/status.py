@@ -1,10 +1,10 @@
-from src.packets import Packet
+from src.packets.template import PacketTemplate
+from src.structs import Long, String
 
 
-class StatusResponse(Packet):
-    def __init__(self, status: dict):
-        super().__init__(packet_id=0x00)
-        self.status = status
-
+class StatusResponse(PacketTemplate, packet_id=0x00):
+    response: String
 
 
+class PingResponse(PacketTemplate, packet_id=0x01):
+    payload: Long
@@ -0,0 +1,119 @@
+import struct
+from typing import Any, Callable, ClassVar
+
+from src.packets.packet import PacketWriter, StaticPacket
+from src.structs import BaseStruct, Struct
+
+Step = Callable[[bytearray, tuple], None]
+
+
+def constant_step(encoded: bytes) -> Step:
+    def step(data: bytearray, args: tuple) -> None:
+        data += encoded
+
+    return step
+
+
+def fixed_step(fields: list[type[Struct]], start: int) -> Step:
+    pack = struct.Struct(">" + "".join(field.fmt.lstrip(">") for field in fields)).pack
+    stop = start + len(fields)
+
+    def step(data: bytearray, args: tuple) -> None:
+        data += pack(*args[start:stop])
+
+    return step
+
+
+def variable_step(field: type[BaseStruct], index: int) -> Step:
+    pack = field.pack
+
+    def step(data: bytearray, args: tuple) -> None:
+        data += pack(args[index])
+
+    return step
+
+
+def compile_template(
+    annotations: dict[str, type[BaseStruct]], constants: dict[str, Any]
+) -> tuple[tuple[str, ...], list[Step]]:
+    """Builds the encoder of a packet from its fields.
+
+    Runs of constant fields are encoded once into a single template chunk, runs of
+    fixed-width variable fields are packed with one ``struct.Struct``.
+    """
+    names: list[str] = list()
+    steps: list[Step] = list()
+    constant = bytearray()
+    fixed_run: list[type[Struct]] = list()
+
+    def flush_fixed() -> None:
+        if fixed_run:
+            steps.append(fixed_step(list(fixed_run), len(names) - len(fixed_run)))
+            fixed_run.clear()
+
+    def flush_constant() -> None:
+        if constant:
+            steps.append(constant_step(bytes(constant)))
+            constant.clear()
+
+    for name, field in annotations.items():
+        if name in constants:
+            flush_fixed()
+            constant += field.pack(constants[name])
+            continue
+
+        flush_constant()
+        if issubclass(field, Struct):
+            fixed_run.append(field)
+        else:
+            flush_fixed()
+            steps.append(variable_step(field, len(names)))
+
+        names.append(name)
+
+    flush_fixed()
+    flush_constant()
+    return tuple(names), steps
+
+
+class PacketTemplate:
+    """An outbound packet declared by its annotated fields, in protocol order.
+
+    Fields with a default are constant and encoded once, when the class is defined.
+    ``build`` takes the other fields, positionally or by name, and only encodes
+    those. Packets without variable fields are framed once as ``frozen``.
+    """
+
+    packet_id: ClassVar[int]
+    fields: ClassVar[tuple[str, ...]]
+    steps: ClassVar[list[Step]]
+    frozen: ClassVar[StaticPacket | None]
+
+    def __init_subclass__(cls, packet_id: int, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.packet_id = packet_id
+
+        # only the fields of this class, a class without any inherits __annotations__
+        annotations = cls.__dict__.get("__annotations__", {})
+        constants = {
+            name: cls.__dict__[name] for name in annotations if name in cls.__dict__
+        }
+        cls.fields, cls.steps = compile_template(annotations, constants)
+        cls.frozen = None if cls.fields else cls.build().freeze()
+
+    @classmethod
+    def build(cls, *args: Any, **kwargs: Any) -> PacketWriter:
+        if kwargs:
+            try:
+                args += tuple(kwargs.pop(name) for name in cls.fields[len(args) :])
+            except KeyError as e:
+                raise TypeError(f"{cls.__name__} is missing field {e}") from None
+
+        if len(args) != len(cls.fields) or kwargs:
+            raise TypeError(f"{cls.__name__} takes the fields {', '.join(cls.fields)}")
+
+        packet = PacketWriter(packet_id=cls.packet_id)
+        for step in cls.steps:
+            step(packet.data, args)
+
+        return packet
@@ -1,16 +1,180 @@
+import itertools
+import logging
+import math
+import uuid
+from typing import Iterable
+
+from twisted.internet import defer
 from twisted.internet.protocol import Protocol
+from twisted.python import failure
+
+from src.compression import Compression
+from src.logs import PacketTrace
+from src.metrics import bytes_sent, packets_sent
+from src.outbound import OutboundQueue
+from src.packets.packet import PacketWriter, StaticPacket
+from src.world import ChunkStreamer
+
+# the limits past which vanilla servers reject a position
+MAX_HORIZONTAL = 3.0e7
+MAX_VERTICAL = 2.0e7
+
+entity_ids = itertools.count(1)
 
-from src.packets.packet import Packet
-from src.structs import VarInt
+logger = logging.getLogger("devon.network")
+
+
+def valid_movement(
+    pos: tuple[float, float, float] | None, rotation: tuple[float, float] | None
+) -> bool:
+    if pos is not None:
+        x, y, z = pos
+        if not (
+            abs(x) <= MAX_HORIZONTAL
+            and abs(z) <= MAX_HORIZONTAL
+            and abs(y) <= MAX_VERTICAL
+        ):
+            # also false for NaN
+            return False
+
+    return rotation is None or all(map(math.isfinite, rotation))
 
 
 class Player:
     def __init__(self, protocol: Protocol) -> None:
         self.protocol = protocol
-        self.pos = 0, 90, 0
+        self.entity_id = next(entity_ids)
+        self.name: str | None = None
+        self.uuid: uuid.UUID | None = None
+        self.pos = 0.0, 90.0, 0.0
+        self.yaw = 0.0
+        self.pitch = 0.0
+        self.on_ground = False
+        self.next_pos: tuple[float, float, float] | None = None
+        self.next_rotation: tuple[float, float] | None = None
+        self.streamer: ChunkStreamer | None = None
+        self.compression: Compression | None = None
+        self.pending_write: defer.Deferred | None = None
+        self.outbound: OutboundQueue | None = None
+        self.trace = PacketTrace()
+
+    def connected(self) -> None:
+        transport = self.protocol.transport
+        self.outbound = OutboundQueue(transport)
+        transport.registerProducer(self.outbound, True)
 
-    def send(self, packet: Packet) -> None:
-        # noinspection PyArgumentList
-        self.protocol.transport.write(
-            VarInt.pack(len(packet.getvalue())) + packet.getvalue()
+    def send(self, *packets: PacketWriter | StaticPacket) -> None:
+        self.record(packets)
+        self.write([packet.frame(self.compression) for packet in packets])
+
+    def record(self, packets: Iterable[PacketWriter | StaticPacket]) -> None:
+        stage = type(self.protocol.state).__name__
+        for packet in packets:
+            size = len(packet)
+            self.trace.record("out", stage, packet.id, size)
+            packets_sent.inc((stage, packet.id))
+            bytes_sent.inc((stage, packet.id), size)
+
+    def write(
+        self, frames: list[bytes | defer.Deferred], droppable: bool = False
+    ) -> None:
+        """Queues framed packets in order, waiting for any that are still being
+        compressed. They are sent when the queue is next flushed.
+        """
+        if self.pending_write is None and all(isinstance(f, bytes) for f in frames):
+            self.outbound.push(frames, droppable)
+            return
+
+        ready = defer.gatherResults(
+            [f if isinstance(f, defer.Deferred) else defer.succeed(f) for f in frames],
+            consumeErrors=True,
         )
+        if self.pending_write is not None:
+            ready = defer.gatherResults([self.pending_write, ready], consumeErrors=True)
+            ready.addCallback(lambda results: results[1])
+
+        self.pending_write = ready
+        ready.addCallback(self.write_ready, ready, droppable)
+        ready.addErrback(self.write_failed)
+
+    def write_ready(
+        self, frames: list[bytes], ready: defer.Deferred, droppable: bool
+    ) -> None:
+        if self.pending_write is ready:
+            self.pending_write = None
+
+        self.outbound.push(frames, droppable)
+
+    def flush(self) -> None:
+        if self.outbound is not None:
+            self.outbound.flush()
+
+    def close(self) -> None:
+        """Sends what is still queued and closes the connection"""
+        transport = self.protocol.transport
+        if self.outbound is not None and not self.outbound.closed:
+            self.outbound.flush(force=True)
+            self.outbound.stopProducing()
+            # a transport with a registered producer never finishes closing
+            transport.unregisterProducer()
+
+        transport.loseConnection()
+
+    def write_failed(self, reason: failure.Failure) -> None:
+        logger.error(
+            "Failed to frame an outbound packet: %s\n%s",
+            reason.getErrorMessage(),
+            self.trace.dump(),
+        )
+        self.close()
+
+    def move(
+        self,
+        pos: tuple[float, float, float] | None,
+        rotation: tuple[float, float] | None,
+        on_ground: bool,
+    ) -> None:
+        """Records the latest movement, which the tracker applies on the next tick"""
+        if not valid_movement(pos, rotation):
+            logger.warning("Invalid movement from %s: %s %s", self.name, pos, rotation)
+            self.close()
+            return
+
+        if pos is not None:
+            self.next_pos = pos
+
+        if rotation is not None:
+            self.next_rotation = rotation
+
+        self.on_ground = on_ground
+        self.protocol.factory.tracker.mark_moved(self)
+
+    def apply_movement(self) -> bool:
+        """Applies the recorded movement and returns whether the player rotated"""
+        if self.next_pos is not None:
+            self.pos = self.next_pos
+            self.next_pos = None
+
+        if self.next_rotation is None:
+            return False
+
+        self.yaw, self.pitch = self.next_rotation
+        self.next_rotation = None
+        return True
+
+    def spawn(self) -> None:
+        factory = self.protocol.factory
+
+        self.streamer = ChunkStreamer(self, factory.world)
+        self.streamer.update(self.pos[0], self.pos[2])
+        factory.ticker.add(self.streamer.tick)
+        factory.tracker.add(self)
+        factory.status.add_player(self.uuid, self.name)
+
+    def disconnected(self) -> None:
+        if self.streamer is not None:
+            factory = self.protocol.factory
+            factory.ticker.remove(self.streamer.tick)
+            self.streamer.close()
+            factory.tracker.remove(self)
+            factory.status.remove_player(self.uuid)
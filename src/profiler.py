@@ -0,0 +1,183 @@
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable
+
+SAMPLE_INTERVAL = 0.005
+WATCHDOG_THRESHOLD = 0.05
+
+logger = logging.getLogger("devon.profiler")
+
+
+def frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class Profiler:
+    """Samples the stack of the reactor thread while it runs a profiled section.
+
+    Handlers and tick phases are run through ``call`` when the profiler is enabled,
+    and each sample is counted as a collapsed stack, the names of the sections
+    followed by the frames inside the innermost one, ready for flame graph tools.
+
+    The same thread acts as a watchdog, logging the stack of any section that has
+    been running for longer than ``threshold`` seconds. It runs while sampling, and
+    on its own after ``watch``.
+
+    While disabled there is no thread and the hooks only check ``enabled``.
+    """
+
+    def __init__(
+        self, interval: float = SAMPLE_INTERVAL, threshold: float = WATCHDOG_THRESHOLD
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.sampling = False
+        self.watching = False
+        self.enabled = False
+
+        # replaced rather than mutated, the sampling thread only ever reads it
+        self.sections: tuple[tuple[str, float], ...] = ()
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self.samples = 0
+        # held by the sampling thread while it counts a sample
+        self.lock = threading.Lock()
+        self.target: int | None = None
+        self.thread: threading.Thread | None = None
+        self.stopping = threading.Event()
+        self.reported: float | None = None
+
+    def call(self, name: str, func: Callable, *args: Any) -> Any:
+        sections = self.sections
+        self.sections = sections + ((name, time.perf_counter()),)
+        try:
+            return func(*args)
+        finally:
+            self.sections = sections
+
+    def start(self) -> None:
+        """Starts sampling the calling thread, which should be the reactor's"""
+        if self.sampling:
+            return
+
+        self.sampling = True
+        self.update()
+        logger.info(
+            "Profiling every %.1fms, reporting sections over %.0fms",
+            self.interval * 1000,
+            self.threshold * 1000,
+        )
+
+    def stop(self) -> None:
+        """Stops sampling. The thread is stopped even while watching, so it can't be
+        in the middle of a sample afterwards, and started again for the watchdog.
+        """
+        watching = self.watching
+        self.sampling = False
+        self.watching = False
+        self.update()
+
+        if watching:
+            self.watching = True
+            self.update()
+
+    def watch(self, threshold: float) -> None:
+        """Logs the stack of sections running over ``threshold`` seconds, also while
+        not sampling
+        """
+        self.threshold = threshold
+        self.watching = True
+        self.update()
+        logger.info("Reporting sections over %.0fms", threshold * 1000)
+
+    def update(self) -> None:
+        """Starts or stops the thread as sampling and watching require"""
+        enabled = self.sampling or self.watching
+        if enabled and self.thread is None:
+            self.target = threading.get_ident()
+            self.stopping.clear()
+            self.thread = threading.Thread(
+                target=self.run, name="devon-profiler", daemon=True
+            )
+            self.thread.start()
+        elif not enabled and self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+
+        self.enabled = enabled
+
+    def toggle(self, directory: Path = Path(".")) -> None:
+        """Starts sampling, or stops and dumps the stacks sampled so far"""
+        if not self.sampling:
+            self.start()
+            return
+
+        self.stop()
+        samples = self.samples
+        path = directory / f"profile-{os.getpid()}-{int(time.time())}.folded"
+        self.dump(path)
+        logger.info("Wrote %d samples to %s", samples, path)
+
+    def run(self) -> None:
+        while not self.stopping.wait(
+            self.interval if self.sampling else self.threshold / 4
+        ):
+            sections = self.sections
+            if not sections:
+                continue
+
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+
+            if self.sampling:
+                self.sample(sections, frame)
+
+            self.check(sections, frame)
+
+    def sample(self, sections: tuple[tuple[str, float], ...], frame: FrameType) -> None:
+        frames = list()
+        while frame is not None and frame.f_code is not Profiler.call.__code__:
+            frames.append(frame_name(frame))
+            frame = frame.f_back
+
+        names = [name for name, _ in sections]
+        with self.lock:
+            self.stacks[";".join(names + frames[::-1])] += 1
+            self.samples += 1
+
+    def check(self, sections: tuple[tuple[str, float], ...], frame: FrameType) -> None:
+        name, started = sections[0]
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold or self.reported == started:
+            return
+
+        self.reported = started
+        logger.warning(
+            "%s has been running for %.0fms:\n%s",
+            " > ".join(name for name, _ in sections),
+            elapsed * 1000,
+            "".join(traceback.format_stack(frame)),
+        )
+
+    def dump(self, path: Path) -> None:
+        """Writes the sampled stacks in the collapsed format and starts over"""
+        with self.lock:
+            stacks = self.stacks
+            self.stacks = collections.Counter()
+            self.samples = 0
+
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+profiler = Profiler()
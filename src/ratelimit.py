@@ -0,0 +1,35 @@
+import time
+
+
+class RateLimiter:
+    """A token bucket per key, refilled at ``rate`` tokens per second up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 65536) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: dict[str, tuple[float, float]] = dict()
+
+    def allow(self, key: str) -> bool:
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+        if tokens < 1:
+            self.buckets[key] = tokens, now
+            return False
+
+        if key not in self.buckets and len(self.buckets) >= self.max_keys:
+            self.prune(now)
+
+        self.buckets[key] = tokens - 1, now
+        return True
+
+    def prune(self, now: float) -> None:
+        """Drops buckets that have refilled completely"""
+        refill_time = self.burst / self.rate
+        self.buckets = {
+            key: bucket
+            for key, bucket in self.buckets.items()
+            if now - bucket[1] < refill_time
+        }
@@ -1,3 +1,5 @@
+import logging
+
 from src.stages.stage import Stage, listen
 from src.structs import (
     UShort,
@@ -5,6 +7,11 @@ from src.structs import (
     VarInt,
 )
 
+# the states a client may ask for, 1.20.4 has no transfer intent yet
+INTENTS = (1, 2)
+
+logger = logging.getLogger("devon.handshake")
+
 
 class HandShake(Stage):
     listeners = dict()
@@ -17,9 +24,17 @@ class HandShake(Stage):
         server_address: String,
         port: UShort,
         next_state: VarInt,
-    ) -> int:
-        print(f"{protocol_version=}")
-        print(f"{server_address=}")
-        print(f"{port=}")
-        print(f"{next_state=}")
+    ) -> int | None:
+        logger.debug(
+            "Handshake with protocol %s to %s:%s, next state %s",
+            protocol_version,
+            server_address,
+            port,
+            next_state,
+        )
+        if next_state not in INTENTS:
+            logger.debug("Rejected handshake with next state %s", next_state)
+            self.player.close()
+            return None
+
         return next_state
@@ -1,33 +1,34 @@
-import uuid
+import logging
 
-from src.packets.packet import Packet
+from src.compression import Compression, DEFAULT_THRESHOLD
+from src.packets.configuration import FINISH_CONFIGURATION
+from src.packets.login import LoginSuccess, set_compression
+from src.packets.packet import StaticPacket
 from src.stages.stage import listen, Stage
 from src.structs import String, UUID
 
+logger = logging.getLogger("devon.login")
+
 
 class Login(Stage):
     listeners = dict()
+    registry_data: StaticPacket = None
+    compression_threshold: int = DEFAULT_THRESHOLD
 
     @listen(0)
     def status_request(self, name: String, _uuid: UUID) -> None:
-        print(name, _uuid)
+        logger.info("%s (%s) is logging in", name, _uuid)
+        self.player.name = name
+        self.player.uuid = _uuid
 
-        login_success = Packet(packet_id=0x2)
-        login_success.pack_uuid(_uuid)
-        login_success.pack_string(name)
-        login_success.pack_varint(0)
+        if self.compression_threshold >= 0:
+            self.player.send(set_compression(self.compression_threshold))
+            self.player.compression = Compression(self.compression_threshold)
 
-        self.player.send(login_success)
+        self.player.send(LoginSuccess.build(_uuid, name))
 
     @listen(3)
     def login_acknowledge(self) -> int:
-        registry_data = Packet(packet_id=0x5)
-        with open("registry_info.packet", "rb") as f:
-            registry_data.write(f.read())
-
-        self.player.send(registry_data)
-
-        finish_config = Packet(packet_id=0x2)
-        self.player.send(finish_config)
+        self.player.send(self.registry_data, FINISH_CONFIGURATION)
 
         return 3
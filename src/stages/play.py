@@ -1,15 +1,32 @@
+import logging
+
+from src.packets import play
+from src.packets.packet import PacketWriter
 from src.stages.stage import listen, Stage
-from src.structs import Boolean, Double, Float, VarInt, Position, Byte
+from src.structs import Boolean, Double, Float, VarInt, Position, Byte, Long
+
+logger = logging.getLogger("devon.play")
 
 
 class Play(Stage):
     listeners = dict()
 
+    def keep_alive(self, keep_alive_id: int) -> PacketWriter:
+        return play.keep_alive(keep_alive_id)
+
+    @listen(0x07)
+    def chunk_batch_received(self, chunks_per_tick: Float) -> None:
+        self.player.streamer.acknowledge_batch(chunks_per_tick)
+
+    @listen(0x15)
+    def keep_alive_response(self, keep_alive_id: Long) -> None:
+        self.player.protocol.keepalive_received(keep_alive_id)
+
     @listen(0x17)
     def set_player_position(
         self, x: Double, y: Double, z: Double, on_ground: Boolean
     ) -> None:
-        print(x, y, z, on_ground)
+        self.player.move((x, y, z), None, on_ground)
 
     @listen(0x18)
     def set_player_position_and_rotation(
@@ -21,11 +38,11 @@ class Play(Stage):
         pitch: Float,
         on_ground: Boolean,
     ) -> None:
-        print(x, y, z, yaw, pitch, on_ground)
+        self.player.move((x, y, z), (yaw, pitch), on_ground)
 
     @listen(0x19)
     def set_player_rotation(self, yaw: Float, pitch: Float, on_ground: Boolean) -> None:
-        print(yaw, pitch, on_ground)
+        self.player.move(None, (yaw, pitch), on_ground)
 
     @listen(0x21)
     def player_action(
@@ -35,4 +52,6 @@ class Play(Stage):
         face: Byte,
         sequence: VarInt,
     ) -> None:
-        print(status, position, face, sequence)
+        logger.debug(
+            "Player action %s at %s facing %s (%s)", status, position, face, sequence
+        )
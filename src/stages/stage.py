@@ -1,44 +1,126 @@
 import abc
 import inspect
+import logging
+import struct
+import time
 from typing import Callable, Any
 
-from src.packets.packet import Packet
+from src.logs import packet_logger
+from src.metrics import bytes_received, handler_seconds, packets_received
+from src.packets.packet import Packet, PacketWriter
 from src.player import Player
+from src.profiler import profiler
+from src.structs import BaseStruct, Struct
 
+Decoder = Callable[[Packet], list[Any]]
+Step = Callable[[memoryview, int, list[Any]], int]
 
-class Stage(metaclass=abc.ABCMeta):
-    listeners: list[int, Callable]
 
-    def __init__(self, player: Player) -> None:
-        self.player = player
+def fixed_step(fields: list[type[Struct]]) -> Step:
+    compiled = struct.Struct(">" + "".join(field.fmt.lstrip(">") for field in fields))
+    unpack_from = compiled.unpack_from
+    size = compiled.size
 
-    @staticmethod
-    def decode_args(func: Callable, packet: Packet) -> list[Any]:
-        args = list()
-        parameter_types = inspect.signature(func).parameters.values()
+    def step(data: memoryview, offset: int, args: list[Any]) -> int:
+        args.extend(unpack_from(data, offset))
+        return offset + size
+
+    return step
+
+
+def variable_step(field: type[BaseStruct]) -> Step:
+    unpack_from = field.unpack_from
+
+    def step(data: memoryview, offset: int, args: list[Any]) -> int:
+        value, offset = unpack_from(data, offset)
+        args.append(value)
+        return offset
+
+    return step
+
+
+def compile_decoder(func: Callable) -> Decoder:
+    """Builds a decoder for the arguments of a listener from its annotations.
+
+    Runs of fixed-width fields are merged into one ``struct.Struct``, every other
+    field is read with its ``unpack_from``.
+    """
+    steps: list[Step] = list()
+    fixed_run: list[type[Struct]] = list()
+
+    for parameter in inspect.signature(func).parameters.values():
+        if parameter.name == "self":
+            continue
+
+        field = parameter.annotation
+        if issubclass(field, Struct):
+            fixed_run.append(field)
+            continue
 
-        for parameter_type in parameter_types:
-            if parameter_type.name == "self":
-                continue
+        if fixed_run:
+            steps.append(fixed_step(fixed_run))
+            fixed_run = list()
 
-            struct = parameter_type.annotation
-            args.append(struct(struct.unpack(packet)))
+        steps.append(variable_step(field))
 
+    if fixed_run:
+        steps.append(fixed_step(fixed_run))
+
+    if not steps:
+        return lambda packet: []
+
+    def decode(packet: Packet) -> list[Any]:
+        args = list()
+        offset = packet.tell()
+        with packet.getbuffer() as data:
+            for step in steps:
+                offset = step(data, offset, args)
+
+        packet.seek(offset)
         return args
 
-    def process_packet(self, packet: Packet) -> int | None:
-        print("------------------------------------------------")
-        print(f"Raw Data: {packet.getvalue().hex(' ')}")
-        print(f"State: {type(self).__name__}")
-        print(f"Packet ID: {hex(packet.id)}")
+    return decode
+
+
+class Stage(metaclass=abc.ABCMeta):
+    listeners: dict[int, tuple[Callable, Decoder]]
+
+    def __init__(self, player: Player) -> None:
+        self.player = player
 
-        if packet.id not in self.listeners:
-            print("PACKET NOT IMPLEMENTED")
+    def keep_alive(self, keep_alive_id: int) -> PacketWriter | None:
+        """The Keep Alive packet of this stage, if it has one"""
+        return None
+
+    def process_packet(self, packet: Packet) -> int | None:
+        stage = type(self).__name__
+        implemented = packet.id in self.listeners
+        # only ids with a listener get their own labels, clients choose the ids
+        key = stage, packet.id if implemented else "unknown"
+        packets_received.inc(key)
+        bytes_received.inc(key, len(packet.getbuffer()))
+
+        logger = packet_logger(stage, packet.id if implemented else None)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s packet %#04x: %s", stage, packet.id, packet.getvalue().hex(" ")
+            )
+
+        if not implemented:
+            logger.debug("%s packet %#04x is not implemented", stage, packet.id)
             return
 
-        func = self.listeners[packet.id]
-        parameters = self.decode_args(func, packet)
-        return func(self, *parameters)
+        func, decode = self.listeners[packet.id]
+        start = time.perf_counter()
+        try:
+            if profiler.enabled:
+                return profiler.call(
+                    f"{stage} {packet.id:#04x}", func, self, *decode(packet)
+                )
+
+            return func(self, *decode(packet))
+        finally:
+            handler_seconds.observe(key, time.perf_counter() - start)
 
 
 class listen_wrap:
@@ -49,7 +131,7 @@ class listen_wrap:
 
     def __set_name__(self, owner, name):
         self.owner = owner
-        self.owner.listeners[self.packet_id] = self.fn
+        self.owner.listeners[self.packet_id] = self.fn, compile_decoder(self.fn)
 
     def __call__(self, *args, **kwargs):
         return self.fn(*args, **kwargs)
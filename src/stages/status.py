@@ -1,8 +1,116 @@
+import base64
 import json
+import os
+import uuid
 
-from src.packets.packet import Packet
+from src.packets.packet import StaticPacket
+from src.packets.status import PingResponse, StatusResponse
 from src.stages.stage import listen, Stage
 from src.structs import Long
+from src.workers import PlayerCounts
+
+SAMPLE_SIZE = 12
+
+
+def load_favicon(path: str | os.PathLike) -> str | None:
+    """Reads a 64x64 PNG and returns it as the data URI used in the status response"""
+    try:
+        with open(path, "rb") as f:
+            return "data:image/png;base64," + base64.b64encode(f.read()).decode()
+    except FileNotFoundError:
+        return None
+
+
+class ServerStatus:
+    """The server list status, framed once and rebuilt only when it changes.
+
+    With ``counts`` the online player count is the total over every worker.
+    """
+
+    def __init__(
+        self,
+        max_players: int,
+        motd: str = "",
+        favicon: str | None = None,
+        counts: PlayerCounts | None = None,
+    ) -> None:
+        self.max_players = max_players
+        self.counts = counts
+        self._motd = motd
+        self._favicon = favicon
+        self._extra: dict | None = None
+        self.players: dict[uuid.UUID, str] = dict()
+        self.cached: StaticPacket | None = None
+        self.cached_online = 0
+
+    @property
+    def motd(self) -> str:
+        return self._motd
+
+    @motd.setter
+    def motd(self, motd: str) -> None:
+        self._motd = motd
+        self.cached = None
+
+    @property
+    def favicon(self) -> str | None:
+        return self._favicon
+
+    @favicon.setter
+    def favicon(self, favicon: str | None) -> None:
+        self._favicon = favicon
+        self.cached = None
+
+    @property
+    def extra(self) -> dict | None:
+        """Additional fields merged into the response, e.g. server statistics"""
+        return self._extra
+
+    @extra.setter
+    def extra(self, extra: dict | None) -> None:
+        self._extra = extra
+        self.cached = None
+
+    def add_player(self, _uuid: uuid.UUID, name: str) -> None:
+        self.players[_uuid] = name
+        self.players_changed()
+
+    def remove_player(self, _uuid: uuid.UUID) -> None:
+        if self.players.pop(_uuid, None) is not None:
+            self.players_changed()
+
+    def players_changed(self) -> None:
+        self.cached = None
+        if self.counts is not None:
+            self.counts.set(len(self.players))
+
+    @property
+    def online(self) -> int:
+        if self.counts is None:
+            return len(self.players)
+
+        return self.counts.total()
+
+    def response(self) -> StaticPacket:
+        online = self.online
+        if self.cached is None or online != self.cached_online:
+            sample = [
+                {"name": name, "id": str(_uuid)}
+                for _uuid, name in list(self.players.items())[:SAMPLE_SIZE]
+            ]
+
+            status = Status.get_status(
+                max_players=self.max_players,
+                player_amount=online,
+                players=sample,
+                description=self.motd,
+                favicon=self.favicon,
+                extra=self.extra,
+            )
+            self.cached = StatusResponse.build(status).freeze()
+            self.cached_online = online
+
+        return self.cached
 
 
 class Status(Stage):
@@ -14,41 +122,36 @@ class Status(Stage):
         player_amount: int,
         players: list[dict] = None,
         description: str = "",
+        favicon: str | None = None,
+        extra: dict | None = None,
     ):
         if players is None:
             players = list()
 
-        return json.dumps(
-            {
-                "version": {"name": "1.20.4", "protocol": 765},
-                "players": {
-                    "max": max_players,
-                    "online": player_amount,
-                    "sample": players,
-                },
-                "description": {"text": description},
-                "favicon": "data:image/png;base64,<data>",
-                "enforcesSecureChat": True,
-                "previewsChat": True,
-            }
-        )
+        status = {
+            "version": {"name": "1.20.4", "protocol": 765},
+            "players": {
+                "max": max_players,
+                "online": player_amount,
+                "sample": players,
+            },
+            "description": {"text": description},
+            "enforcesSecureChat": True,
+            "previewsChat": True,
+        }
+        if favicon is not None:
+            status["favicon"] = favicon
+
+        if extra is not None:
+            status.update(extra)
+
+        return json.dumps(status)
 
     @listen(0)
     def status_request(self) -> None:
-        status = Packet(packet_id=0x00)
-        status.pack_string(
-            self.get_status(
-                max_players=69,
-                player_amount=3,
-                players=None,
-                description="Puto el que lo lea",
-            )
-        )
-        print(status.getvalue())
-        self.player.send(status)
+        self.player.send(self.player.protocol.factory.status.response())
 
     @listen(1)
     def ping_request(self, value: Long) -> None:
-        ping = Packet(packet_id=0x01)
-        ping.pack_long(value)
-        self.player.send(ping)
+        self.player.send(PingResponse.build(value))
+        self.player.close()
@@ -1,11 +1,28 @@
 import abc
+import functools
 import struct
 import uuid
 from io import BytesIO
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Iterable
+
+import numpy as np
 
 
 class BaseStruct(metaclass=abc.ABCMeta):
+    """A wire type. Structs are used as classes and never instantiated, so a missing
+    method is reported when the class is created rather than by ``abc``.
+    """
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        missing = [
+            name
+            for name in sorted(BaseStruct.__abstractmethods__)
+            if getattr(getattr(cls, name), "__isabstractmethod__", False)
+        ]
+        if missing:
+            raise TypeError(f"{cls.__name__} does not implement {', '.join(missing)}")
+
     @classmethod
     @abc.abstractmethod
     def pack(cls, val: Any) -> bytes:
@@ -16,6 +33,12 @@ class BaseStruct(metaclass=abc.ABCMeta):
     def unpack(cls, buffer: BytesIO) -> Any:
         raise NotImplementedError
 
+    @classmethod
+    @abc.abstractmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[Any, int]:
+        """Decodes a value at ``offset``, returns it and the offset right after it"""
+        raise NotImplementedError
+
 
 class Struct(int, BaseStruct):
     fmt: ClassVar[str]
@@ -28,6 +51,13 @@ class Struct(int, BaseStruct):
     def unpack(cls, buffer: BytesIO) -> bool:
         return buffer.unpack(cls.fmt)
 
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[Any, int]:
+        return (
+            struct.unpack_from(cls.fmt, data, offset)[0],
+            offset + struct.calcsize(cls.fmt),
+        )
+
 
 class Boolean(Struct):
     fmt = "?"
@@ -42,11 +72,11 @@ class UByte(Struct):
 
 
 class Short(Struct):
-    fmt = "h"
+    fmt = ">h"
 
 
 class UShort(Struct):
-    fmt = ">h"
+    fmt = ">H"
 
 
 class Int(Struct):
@@ -76,57 +106,270 @@ class String(str, BaseStruct):
         str_length = VarInt.unpack(buffer)
         return buffer.read(str_length).decode("utf-8")
 
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[str, int]:
+        str_length, offset = VarInt.unpack_from(data, offset)
+        end = offset + str_length
+        return str(data[offset:end], "utf-8"), end
+
 
 Identifier = String
 
 
-class VarInt(int, BaseStruct):
+class Bytes(bytes, BaseStruct):
+    """Bytes prefixed with their length"""
+
+    @classmethod
+    def pack(cls, val: bytes) -> bytes:
+        return VarInt.pack(len(val)) + val
+
+    @classmethod
+    def unpack(cls, buffer: BytesIO) -> bytes:
+        return buffer.read(VarInt.unpack(buffer))
+
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[bytes, int]:
+        length, offset = VarInt.unpack_from(data, offset)
+        return bytes(data[offset : offset + length]), offset + length
+
+
+class Raw(bytes, BaseStruct):
+    """Bytes written as they are, such as already encoded NBT"""
+
+    @classmethod
+    def pack(cls, val: bytes) -> bytes:
+        return bytes(val)
+
+    @classmethod
+    def unpack(cls, buffer: BytesIO) -> bytes:
+        return buffer.read()
+
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[bytes, int]:
+        return bytes(data[offset:]), len(data)
+
+
+SINGLE_BYTES = [bytes((value,)) for value in range(0x80)]
+# the number of values from which pack_many and unpack_many switch to NumPy
+PACK_BULK_CUTOFF = 256
+UNPACK_BULK_CUTOFF = 64
+
+
+class VarNum(int, BaseStruct):
+    bits: ClassVar[int]
+    max_bytes: ClassVar[int]
+
     @classmethod
     def pack(cls, val: int) -> bytes:
+        if 0 <= val < 0x80:
+            return SINGLE_BYTES[val]
+
+        if 0 <= val < 0x4000:
+            return bytes((0x80 | (val & 0x7F), val >> 7))
+
         if val < 0:
-            val = (1 << 32) + val
+            val += 1 << cls.bits
 
-        total = b""
+        total = bytearray()
         while val >= 0x80:
-            bits = val & 0x7F
+            total.append(0x80 | (val & 0x7F))
             val >>= 7
-            total += struct.pack("B", (0x80 | bits))
-
-        bits = val & 0x7F
-        total += struct.pack("B", bits)
 
-        return total
+        total.append(val)
+        return bytes(total)
 
     @classmethod
     def unpack(cls, buffer: BytesIO) -> int:
-        total = 0
-        shift = 0
+        val = buffer.read(1)[0]
+        if val < 0x80:
+            return val
 
-        val = 0x80
+        total = val & 0x7F
+        shift = 7
         while val & 0x80:
-            val = struct.unpack("B", buffer.read(1))[0]
+            if shift >= cls.max_bytes * 7:
+                raise ValueError(f"{cls.__name__} is too big")
+
+            val = buffer.read(1)[0]
             total |= (val & 0x7F) << shift
             shift += 7
 
-        if total & (1 << 31):
-            total = total - (1 << 32)
+        return cls.signed(total)
+
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[int, int]:
+        val = data[offset]
+        if val < 0x80:
+            return val, offset + 1
+
+        second = data[offset + 1]
+        if second < 0x80:
+            return (val & 0x7F) | (second << 7), offset + 2
+
+        total = (val & 0x7F) | ((second & 0x7F) << 7)
+        shift = 14
+        offset += 2
+        val = second
+        while val & 0x80:
+            if shift >= cls.max_bytes * 7:
+                raise ValueError(f"{cls.__name__} is too big")
+
+            val = data[offset]
+            offset += 1
+            total |= (val & 0x7F) << shift
+            shift += 7
+
+        return cls.signed(total), offset
+
+    @classmethod
+    def signed(cls, total: int) -> int:
+        if total >= 1 << (cls.bits - 1):
+            total -= 1 << cls.bits
 
         return total
 
+    @classmethod
+    def pack_many(cls, values: Iterable[int] | np.ndarray) -> bytes:
+        """Encodes every value back to back.
+
+        From ``PACK_BULK_CUTOFF`` values on, they are encoded with NumPy a byte
+        position at a time instead of one value at a time.
+        """
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+
+        if len(values) < PACK_BULK_CUTOFF:
+            if isinstance(values, np.ndarray):
+                values = values.tolist()
+
+            return b"".join(map(cls.pack, values))
+
+        try:
+            encoded = np.asarray(values, dtype=np.int64).astype(np.uint64)
+        except OverflowError:
+            # unsigned longs of 2 ** 63 or more don't fit a signed array
+            return b"".join(map(cls.pack, values))
+
+        if cls.bits < 64:
+            encoded &= np.uint64((1 << cls.bits) - 1)
+
+        if not encoded.size or encoded.max() < 0x80:
+            return encoded.astype(np.uint8).tobytes()
+
+        lengths = np.ones(encoded.size, dtype=np.intp)
+        for index in range(1, cls.max_bytes):
+            lengths += encoded >= np.uint64(1 << (7 * index))
+
+        starts = np.cumsum(lengths) - lengths
+        total = np.empty(int(lengths.sum()), dtype=np.uint8)
+        for index in range(cls.max_bytes):
+            present = lengths > index
+            if not present.any():
+                break
+
+            byte = (encoded[present] >> np.uint64(7 * index)) & np.uint64(0x7F)
+            byte |= (lengths[present] > index + 1).astype(np.uint64) << np.uint64(7)
+            total[starts[present] + index] = byte
+
+        return total.tobytes()
+
+    @classmethod
+    def unpack_many(
+        cls, data: memoryview, count: int, offset: int = 0
+    ) -> tuple[list[int], int]:
+        """Decodes ``count`` consecutive values starting at ``offset``.
+
+        From ``UNPACK_BULK_CUTOFF`` values on, every value is decoded at once with
+        NumPy, grouping the bytes by the last byte of each value.
+        """
+        if count >= UNPACK_BULK_CUTOFF:
+            return cls.unpack_bulk(data, count, offset)
+
+        unpack_from = cls.unpack_from
+        values = [0] * count
+
+        for index in range(count):
+            val = data[offset]
+            if val < 0x80:
+                values[index] = val
+                offset += 1
+            else:
+                values[index], offset = unpack_from(data, offset)
+
+        return values, offset
+
+    @classmethod
+    def unpack_bulk(
+        cls, data: memoryview, count: int, offset: int
+    ) -> tuple[list[int], int]:
+        raw = np.frombuffer(data, dtype=np.uint8, offset=offset)
+        window = raw[: count * cls.max_bytes]
+        ends = np.flatnonzero(window < 0x80)[:count]
+        starts = np.zeros(ends.size, dtype=np.intp)
+        starts[1:] = ends[:-1] + 1
+        lengths = ends - starts + 1
+        if ends.size < count:
+            unfinished = window.size - (int(ends[-1]) + 1 if ends.size else 0)
+            if unfinished >= cls.max_bytes or (
+                lengths.size and lengths.max() > cls.max_bytes
+            ):
+                raise ValueError(f"{cls.__name__} is too big")
+
+            raise IndexError(f"Expected {count} {cls.__name__}s")
+
+        size = int(ends[-1]) + 1
+        if size == count:
+            return raw[:size].tolist(), offset + size
+
+        if lengths.max() > cls.max_bytes:
+            raise ValueError(f"{cls.__name__} is too big")
+
+        shifts = np.arange(size) - np.repeat(starts, lengths)
+        groups = (raw[:size] & 0x7F).astype(np.uint64) << (
+            shifts.astype(np.uint64) * np.uint64(7)
+        )
+        values = np.bitwise_or.reduceat(groups, starts)
+        if cls.bits < 64:
+            values = values.astype(np.int64)
+            values[values >= 1 << (cls.bits - 1)] -= 1 << cls.bits
+        else:
+            values = values.view(np.int64)
+
+        return values.tolist(), offset + size
+
+
+class VarInt(VarNum):
+    bits = 32
+    max_bytes = 5
+
+
+class VarLong(VarNum):
+    bits = 64
+    max_bytes = 10
+
 
 class Position(tuple, BaseStruct):
     @classmethod
     def pack(cls, position: tuple[int, int, int]) -> bytes:
-        return Long.pack(
+        # unsigned, a negative x sets the sign bit of the encoded long
+        return struct.pack(
+            ">Q",
             ((position[0] & 0x3FFFFFF) << 38)
             | ((position[2] & 0x3FFFFFF) << 12)
-            | (position[1] & 0xFFF)
+            | (position[1] & 0xFFF),
         )
 
     @classmethod
     def unpack(cls, buffer: BytesIO) -> tuple[int, int, int]:
-        encoded_position = Long.unpack(buffer)
+        return cls.decode(Long.unpack(buffer))
+
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[tuple, int]:
+        encoded_position, offset = Long.unpack_from(data, offset)
+        return cls.decode(encoded_position), offset
 
+    @staticmethod
+    def decode(encoded_position: int) -> tuple[int, int, int]:
         x = encoded_position >> 38
         y = encoded_position & 0xFFF
         z = (encoded_position >> 12) & 0x3FFFFFF
@@ -151,3 +394,41 @@ class UUID(uuid.UUID, BaseStruct):
     @classmethod
     def unpack(cls, buffer: BytesIO) -> str:
         return uuid.UUID(bytes=buffer.read(16)).hex
+
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[uuid.UUID, int]:
+        end = offset + 16
+        return uuid.UUID(bytes=bytes(data[offset:end])), end
+
+
+class Array(list, BaseStruct):
+    """Elements prefixed with their count, ``Array[String]`` is a list of strings"""
+
+    element: ClassVar[type[BaseStruct]]
+
+    def __class_getitem__(cls, element: type[BaseStruct]) -> type["Array"]:
+        return array_of(element)
+
+    @classmethod
+    def pack(cls, val: Iterable[Any]) -> bytes:
+        values = list(val)
+        return VarInt.pack(len(values)) + b"".join(map(cls.element.pack, values))
+
+    @classmethod
+    def unpack(cls, buffer: BytesIO) -> list[Any]:
+        return [cls.element.unpack(buffer) for _ in range(VarInt.unpack(buffer))]
+
+    @classmethod
+    def unpack_from(cls, data: memoryview, offset: int) -> tuple[list[Any], int]:
+        count, offset = VarInt.unpack_from(data, offset)
+        values = list()
+        for _ in range(count):
+            value, offset = cls.element.unpack_from(data, offset)
+            values.append(value)
+
+        return values, offset
+
+
+@functools.cache
+def array_of(element: type[BaseStruct]) -> type[Array]:
+    return type(f"Array[{element.__name__}]", (Array,), {"element": element})
@@ -0,0 +1,165 @@
+import collections
+import logging
+import time
+from typing import Any, Callable
+
+from twisted.internet import task
+
+from src.metrics import tick_seconds
+from src.profiler import profiler
+
+TPS = 20
+TICK_INTERVAL = 1 / TPS
+WHEEL_SIZE = 512
+REPORT_INTERVAL = 60 * TPS
+RECENT_TICKS = 5 * TPS
+
+logger = logging.getLogger("devon.tick")
+
+
+class Timer:
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(
+        self, deadline: int, callback: Callable, args: tuple[Any, ...]
+    ) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerWheel:
+    """A hashed timer wheel with one slot per tick.
+
+    Timers further away than the wheel size stay in their slot until the wheel has
+    gone round enough times to reach their deadline.
+    """
+
+    def __init__(self, size: int = WHEEL_SIZE) -> None:
+        self.slots: list[list[Timer]] = [list() for _ in range(size)]
+        self.tick = 0
+
+    def schedule(self, delay: int, callback: Callable, *args: Any) -> Timer:
+        """Runs ``callback(*args)`` after ``delay`` ticks"""
+        timer = Timer(self.tick + max(1, delay), callback, args)
+        self.slots[timer.deadline % len(self.slots)].append(timer)
+        return timer
+
+    def advance(self) -> None:
+        self.tick += 1
+        index = self.tick % len(self.slots)
+
+        due = list()
+        remaining = list()
+        for timer in self.slots[index]:
+            if timer.cancelled:
+                continue
+
+            (due if timer.deadline <= self.tick else remaining).append(timer)
+
+        self.slots[index] = remaining
+        for timer in due:
+            try:
+                timer.callback(*timer.args)
+            except Exception:
+                logger.exception("Timer %r failed", timer.callback)
+
+
+class TickLoop:
+    """Runs the server at a fixed tick rate, advancing the timer wheel and every
+    registered per-tick task, and keeps track of how long each tick takes.
+
+    Tasks added with ``last`` run after all the others, to act on what they did.
+    """
+
+    def __init__(self) -> None:
+        self.wheel = TimerWheel()
+        self.tasks: dict[Callable[[], None], None] = dict()
+        self.last_tasks: dict[Callable[[], None], None] = dict()
+        self.loop = task.LoopingCall(self.tick)
+
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.ticks = 0
+        self.overruns = 0
+        self.recent: collections.deque[float] = collections.deque(maxlen=RECENT_TICKS)
+
+    def start(self) -> None:
+        self.wheel.schedule(REPORT_INTERVAL, self.report)
+        self.loop.start(TICK_INTERVAL)
+
+    def stop(self) -> None:
+        if self.loop.running:
+            self.loop.stop()
+
+    def add(self, callback: Callable[[], None], last: bool = False) -> None:
+        (self.last_tasks if last else self.tasks)[callback] = None
+
+    def remove(self, callback: Callable[[], None]) -> None:
+        self.tasks.pop(callback, None)
+        self.last_tasks.pop(callback, None)
+
+    def schedule(self, delay: int, callback: Callable, *args: Any) -> Timer:
+        return self.wheel.schedule(delay, callback, *args)
+
+    def tick(self) -> None:
+        start = time.perf_counter()
+        if profiler.enabled:
+            profiler.call("tick", self.run_tasks, True)
+        else:
+            self.run_tasks()
+
+        duration = time.perf_counter() - start
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+        self.recent.append(duration)
+        tick_seconds.observe((), duration)
+        self.ticks += 1
+        if duration > TICK_INTERVAL:
+            self.overruns += 1
+
+    def run_tasks(self, profiled: bool = False) -> None:
+        if profiled:
+            profiler.call("timers", self.wheel.advance)
+        else:
+            self.wheel.advance()
+
+        for callback in [*self.tasks, *self.last_tasks]:
+            try:
+                if profiled:
+                    name = getattr(callback, "__qualname__", repr(callback))
+                    profiler.call(name, callback)
+                else:
+                    callback()
+            except Exception:
+                logger.exception("Tick task %r failed", callback)
+
+    @property
+    def mean_duration(self) -> float:
+        return self.total_duration / self.ticks if self.ticks else 0.0
+
+    def stats(self) -> dict[str, float | int]:
+        """Tick durations over the last few seconds, in milliseconds"""
+        recent = self.recent or [0.0]
+        return {
+            "mean_ms": round(sum(recent) / len(recent) * 1000, 3),
+            "max_ms": round(max(recent) * 1000, 3),
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+        }
+
+    def report(self) -> None:
+        logger.info(
+            "Tick mean %.2fms, max %.2fms, overruns %d",
+            self.mean_duration * 1000,
+            self.max_duration * 1000,
+            self.overruns,
+        )
+        self.max_duration = 0.0
+        self.wheel.schedule(REPORT_INTERVAL, self.report)
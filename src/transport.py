@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from typing import Iterable, Protocol
+
+from twisted.internet import asyncioreactor
+from twisted.internet import protocol
+from twisted.internet.interfaces import IPushProducer
+from twisted.internet.address import IPv4Address, IPv6Address
+from twisted.python import failure
+
+logger = logging.getLogger("devon.network")
+
+
+class Transport(Protocol):
+    """The part of Twisted's ITransport the server uses, provided by every backend"""
+
+    disconnecting: bool
+
+    def write(self, data: bytes) -> None: ...
+
+    def writeSequence(self, data: Iterable[bytes]) -> None: ...
+
+    def loseConnection(self) -> None: ...
+
+    def abortConnection(self) -> None: ...
+
+    def pauseProducing(self) -> None: ...
+
+    def resumeProducing(self) -> None: ...
+
+    def registerProducer(self, producer: IPushProducer, streaming: bool) -> None: ...
+
+    def unregisterProducer(self) -> None: ...
+
+    def getPeer(self) -> IPv4Address | IPv6Address: ...
+
+
+class AsyncioTransport:
+    """An asyncio transport seen through the Twisted transport interface"""
+
+    def __init__(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        self.producer: IPushProducer | None = None
+
+    @property
+    def disconnecting(self) -> bool:
+        return self.transport.is_closing()
+
+    def write(self, data: bytes) -> None:
+        self.transport.write(data)
+
+    def writeSequence(self, data: Iterable[bytes]) -> None:
+        self.transport.writelines(data)
+
+    def loseConnection(self) -> None:
+        self.transport.close()
+
+    def abortConnection(self) -> None:
+        self.transport.abort()
+
+    def pauseProducing(self) -> None:
+        self.transport.pause_reading()
+
+    def resumeProducing(self) -> None:
+        if not self.transport.is_closing():
+            self.transport.resume_reading()
+
+    def registerProducer(self, producer: IPushProducer, streaming: bool) -> None:
+        self.producer = producer
+
+    def unregisterProducer(self) -> None:
+        self.producer = None
+
+    def getPeer(self) -> IPv4Address | IPv6Address:
+        host, port = self.transport.get_extra_info("peername")[:2]
+        if ":" in host:
+            return IPv6Address("TCP", host, port)
+
+        return IPv4Address("TCP", host, port)
+
+
+class AsyncioProtocol(asyncio.Protocol):
+    """Runs a Twisted protocol, and with it the stages, on an asyncio connection"""
+
+    def __init__(self, wrapped: protocol.Protocol) -> None:
+        self.wrapped = wrapped
+        self.transport: AsyncioTransport | None = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = AsyncioTransport(transport)
+        self.wrapped.makeConnection(self.transport)
+
+    def data_received(self, data: bytes) -> None:
+        self.wrapped.dataReceived(data)
+
+    def pause_writing(self) -> None:
+        if self.transport.producer is not None:
+            self.transport.producer.pauseProducing()
+
+    def resume_writing(self) -> None:
+        if self.transport.producer is not None:
+            self.transport.producer.resumeProducing()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self.transport.producer is not None:
+            self.transport.producer.stopProducing()
+
+        reason = protocol.connectionDone if exc is None else failure.Failure(exc)
+        self.wrapped.connectionLost(reason)
+
+
+def install_asyncio_reactor() -> asyncio.AbstractEventLoop:
+    """Runs the Twisted reactor on an asyncio loop, from uvloop when it is installed.
+
+    Has to be called before anything imports ``twisted.internet.reactor``.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    else:
+        loop = uvloop.new_event_loop()
+
+    logger.info("Running on %s", type(loop).__name__)
+    asyncio.set_event_loop(loop)
+    asyncioreactor.install(loop)
+    return loop
+
+
+def listen_asyncio(
+    loop: asyncio.AbstractEventLoop,
+    factory: protocol.ServerFactory,
+    port: int,
+    reuse_port: bool = False,
+) -> asyncio.Server:
+    """Accepts connections with asyncio, handing each to a protocol from ``factory``"""
+    from twisted.internet import reactor
+
+    factory.doStart()
+    server = loop.run_until_complete(
+        loop.create_server(
+            lambda: AsyncioProtocol(factory.buildProtocol(None)),
+            port=port,
+            reuse_port=reuse_port,
+        )
+    )
+
+    def stop() -> None:
+        server.close()
+        factory.doStop()
+
+    reactor.addSystemEventTrigger("before", "shutdown", stop)
+    return server
@@ -0,0 +1,144 @@
+import logging
+import mmap
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from twisted.internet.interfaces import IListeningPort, IReactorSocket
+from twisted.internet.protocol import ServerFactory
+
+RESTART_DELAY = 1.0
+MIN_UPTIME = 5.0
+BACKLOG = 128
+
+logger = logging.getLogger("devon.workers")
+
+
+class PlayerCounts:
+    """The player count of every worker in a shared memory mapped file.
+
+    Each worker only writes its own slot, so no locking is needed.
+    """
+
+    slot_size = 4
+
+    def __init__(self, path: str, workers: int, index: int | None = None) -> None:
+        self.path = path
+        self.index = index
+        with open(path, "r+b") as f:
+            self.map = mmap.mmap(f.fileno(), workers * self.slot_size)
+
+        self.slots = memoryview(self.map).cast("i")
+
+    @classmethod
+    def create(cls, workers: int) -> "PlayerCounts":
+        fd, path = tempfile.mkstemp(prefix="devon-players-")
+        os.ftruncate(fd, workers * cls.slot_size)
+        os.close(fd)
+        return cls(path, workers)
+
+    def set(self, count: int) -> None:
+        self.slots[self.index] = count
+
+    def reset(self, index: int) -> None:
+        self.slots[index] = 0
+
+    def total(self) -> int:
+        return sum(self.slots)
+
+    def close(self) -> None:
+        self.slots.release()
+        self.map.close()
+
+    def unlink(self) -> None:
+        self.close()
+        os.unlink(self.path)
+
+
+def listen_reuseport(
+    reactor: IReactorSocket, port: int, factory: ServerFactory
+) -> IListeningPort:
+    """Listens on a socket with SO_REUSEPORT, so the kernel spreads new
+    connections over every worker listening on the same port.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("", port))
+    sock.listen(BACKLOG)
+    sock.setblocking(False)
+
+    try:
+        return reactor.adoptStreamPort(sock.fileno(), socket.AF_INET, factory)
+    finally:
+        sock.close()
+
+
+class Supervisor:
+    """Runs a command once per worker and restarts workers that exit.
+
+    Every worker gets ``--worker <index> --player-counts <path>`` appended to the
+    command.
+    """
+
+    def __init__(self, command: list[str], workers: int) -> None:
+        self.command = command
+        self.workers = workers
+        self.counts = PlayerCounts.create(workers)
+        self.processes: dict[int, subprocess.Popen] = dict()
+        self.started: dict[int, float] = dict()
+
+    def spawn(self, index: int) -> None:
+        self.counts.reset(index)
+        process = subprocess.Popen(
+            self.command + ["--worker", str(index), "--player-counts", self.counts.path]
+        )
+        self.processes[index] = process
+        self.started[index] = time.monotonic()
+        logger.info("Started worker %d (pid %d)", index, process.pid)
+
+    def forward(self, signum: int, frame) -> None:
+        for process in self.processes.values():
+            process.send_signal(signum)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit())
+        signal.signal(signal.SIGUSR1, self.forward)
+        signal.signal(signal.SIGUSR2, self.forward)
+
+        try:
+            for index in range(self.workers):
+                self.spawn(index)
+
+            while True:
+                pid, status = os.wait()
+                index = next(
+                    (i for i, p in self.processes.items() if p.pid == pid), None
+                )
+                if index is None:
+                    continue
+
+                self.processes[index].returncode = os.waitstatus_to_exitcode(status)
+                logger.warning(
+                    "Worker %d (pid %d) exited with %d, restarting",
+                    index,
+                    pid,
+                    self.processes[index].returncode,
+                )
+                if time.monotonic() - self.started[index] < MIN_UPTIME:
+                    time.sleep(RESTART_DELAY)
+
+                self.spawn(index)
+        finally:
+            for process in self.processes.values():
+                if process.returncode is None:
+                    process.terminate()
+
+            for process in self.processes.values():
+                process.wait()
+
+            self.counts.unlink()
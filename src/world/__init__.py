@@ -0,0 +1,7 @@
+from src.world.chunk import Chunk, ChunkSection
+from src.world.terrain import FlatGenerator, TerrainGenerator
+from src.world.world import ChunkCache, World
+from src.world.streaming import ChunkStreamer
+from src.world.blocks import BlockStates
+from src.world.region import AnvilSource, RegionFile, RegionStorage
+from src.world.tracker import EntityTracker
@@ -0,0 +1,62 @@
+import json
+import os
+
+from src.world import terrain
+
+AIR = 0
+AIR_BLOCKS = {"minecraft:air", "minecraft:cave_air", "minecraft:void_air"}
+
+DEFAULT_STATES = {
+    "minecraft:stone": terrain.STONE,
+    "minecraft:grass_block": terrain.GRASS_BLOCK,
+    "minecraft:dirt": terrain.DIRT,
+    "minecraft:bedrock": terrain.BEDROCK,
+    "minecraft:water": terrain.WATER,
+    "minecraft:sand": terrain.SAND,
+}
+
+
+class BlockStates:
+    """Maps block names and properties, as saved in region files, to block state ids.
+
+    Without the block report of the vanilla data generator only a handful of blocks
+    are known, in their default state, and any other block becomes ``unknown``.
+    """
+
+    def __init__(
+        self,
+        defaults: dict[str, int] = None,
+        states: dict[str, dict[frozenset, int]] = None,
+        unknown: int = terrain.STONE,
+    ) -> None:
+        self.defaults = DEFAULT_STATES if defaults is None else defaults
+        self.states = dict() if states is None else states
+        self.unknown = unknown
+
+    @classmethod
+    def from_report(cls, path: str | os.PathLike) -> "BlockStates":
+        """Loads ``reports/blocks.json`` from the vanilla data generator"""
+        with open(path) as f:
+            report = json.load(f)
+
+        defaults = dict()
+        states = dict()
+        for name, block in report.items():
+            for state in block["states"]:
+                properties = frozenset(state.get("properties", {}).items())
+                states.setdefault(name, dict())[properties] = state["id"]
+                if state.get("default"):
+                    defaults[name] = state["id"]
+
+        return cls(defaults, states)
+
+    def lookup(self, name: str, properties: dict[str, str] = None) -> int:
+        if name in AIR_BLOCKS:
+            return AIR
+
+        if properties and name in self.states:
+            state = self.states[name].get(frozenset(properties.items()))
+            if state is not None:
+                return state
+
+        return self.defaults.get(name, self.unknown)
@@ -0,0 +1,155 @@
+import numpy as np
+
+from src.buffer import WriteBuffer
+from src.packets.packet import StaticPacket
+from src.packets.play import ChunkData
+from src.structs import VarInt
+
+SECTION_COUNT = 24
+MIN_Y = -64
+
+BLOCK_BITS = 4, 8, 15
+BIOME_BITS = 1, 3, 6
+
+
+def pack_bits(indices: np.ndarray, bits: int) -> np.ndarray:
+    """Packs ``indices`` into longs of ``64 // bits`` entries, none spanning two"""
+    per_long = 64 // bits
+    count = -(-indices.size // per_long)
+
+    padded = np.zeros(count * per_long, dtype=np.uint64)
+    padded[: indices.size] = indices.ravel()
+
+    shifts = np.arange(per_long, dtype=np.uint64) * np.uint64(bits)
+    return np.bitwise_or.reduce(padded.reshape(count, per_long) << shifts, axis=1)
+
+
+def unpack_bits(data: np.ndarray, bits: int, count: int) -> np.ndarray:
+    """Reverses ``pack_bits``, returning the first ``count`` entries"""
+    per_long = 64 // bits
+    shifts = np.arange(per_long, dtype=np.uint64) * np.uint64(bits)
+    mask = np.uint64((1 << bits) - 1)
+
+    values = (data.astype(np.uint64)[:, np.newaxis] >> shifts) & mask
+    if values.size < count:
+        raise ValueError(f"Expected {count} entries but only got {values.size}")
+
+    return values.ravel()[:count]
+
+
+def encode_paletted(values: np.ndarray, bits: tuple[int, int, int]) -> bytes:
+    """Encodes a paletted container with the smallest palette that fits ``values``.
+
+    ``bits`` holds the minimum and maximum bits per entry of the indirect palette and
+    the bits per entry of the direct palette.
+    """
+    min_bits, max_bits, direct_bits = bits
+    palette, indices = np.unique(values, return_inverse=True)
+
+    container = WriteBuffer()
+    if palette.size == 1:
+        container.pack_ubyte(0)
+        container.pack_varint(int(palette[0]))
+        container.pack_varint(0)
+        return container.getvalue()
+
+    entry_bits = max(min_bits, (palette.size - 1).bit_length())
+    if entry_bits > max_bits:
+        container.pack_ubyte(direct_bits)
+        data = pack_bits(values, direct_bits)
+    else:
+        container.pack_ubyte(entry_bits)
+        container.pack_varint(palette.size)
+        container.write(VarInt.pack_many(palette))
+        data = pack_bits(indices, entry_bits)
+
+    container.pack_varint(data.size)
+    container.write(data.astype(">u8").tobytes())
+    return container.getvalue()
+
+
+class ChunkSection:
+    """A 16x16x16 block section. Block states are indexed ``[y, z, x]`` and biomes
+    ``[y // 4, z // 4, x // 4]``.
+
+    Call ``changed`` after editing ``blocks`` or ``biomes`` directly.
+    """
+
+    def __init__(self, blocks: np.ndarray = None, biomes: np.ndarray = None) -> None:
+        self.blocks = (
+            np.zeros((16, 16, 16), dtype=np.int32) if blocks is None else blocks
+        )
+        self.biomes = np.zeros((4, 4, 4), dtype=np.int32) if biomes is None else biomes
+        self.version = 0
+        self.encoded: bytes | None = None
+
+    def changed(self) -> None:
+        self.version += 1
+        self.encoded = None
+
+    def get_block(self, x: int, y: int, z: int) -> int:
+        return int(self.blocks[y, z, x])
+
+    def set_block(self, x: int, y: int, z: int, state: int) -> None:
+        self.blocks[y, z, x] = state
+        self.changed()
+
+    def set_biome(self, x: int, y: int, z: int, biome: int) -> None:
+        self.biomes[y // 4, z // 4, x // 4] = biome
+        self.changed()
+
+    def fill(self, state: int) -> None:
+        self.blocks.fill(state)
+        self.changed()
+
+    def encode(self) -> bytes:
+        if self.encoded is None:
+            section = WriteBuffer()
+            section.pack_short(int(np.count_nonzero(self.blocks)))
+            section.write(encode_paletted(self.blocks, BLOCK_BITS))
+            section.write(encode_paletted(self.biomes, BIOME_BITS))
+            self.encoded = section.getvalue()
+
+        return self.encoded
+
+
+class Chunk:
+    def __init__(self, x: int, z: int, sections: list[ChunkSection] = None) -> None:
+        self.x = x
+        self.z = z
+        self.sections = sections or [ChunkSection() for _ in range(SECTION_COUNT)]
+
+        self.cached_versions: tuple[int, ...] | None = None
+        self.cached_packet: StaticPacket | None = None
+
+    @classmethod
+    def filled(cls, x: int, z: int, state: int) -> "Chunk":
+        chunk = cls(x, z)
+        for section in chunk.sections:
+            section.fill(state)
+
+        return chunk
+
+    def section_at(self, y: int) -> ChunkSection:
+        return self.sections[(y - MIN_Y) >> 4]
+
+    def get_block(self, x: int, y: int, z: int) -> int:
+        return self.section_at(y).get_block(x & 15, y & 15, z & 15)
+
+    def set_block(self, x: int, y: int, z: int, state: int) -> None:
+        self.section_at(y).set_block(x & 15, y & 15, z & 15, state)
+
+    def data(self) -> bytes:
+        return b"".join([section.encode() for section in self.sections])
+
+    def packet(self) -> StaticPacket:
+        """The Chunk Data and Update Light packet, rebuilt when a section changed"""
+        versions = tuple(section.version for section in self.sections)
+        if versions != self.cached_versions:
+            self.cached_packet = self.build_packet()
+            self.cached_versions = versions
+
+        return self.cached_packet
+
+    def build_packet(self) -> StaticPacket:
+        return ChunkData.build(self.x, self.z, self.data()).freeze()
@@ -0,0 +1,182 @@
+import gzip
+import logging
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from src import nbt
+from src.world.blocks import BlockStates
+from src.world.chunk import MIN_Y, SECTION_COUNT, unpack_bits
+from src.world.world import Generator
+
+SECTOR_SIZE = 4096
+HEADER_SIZE = 2 * SECTOR_SIZE
+REGION_CHUNKS = 32
+
+GZIP = 1
+ZLIB = 2
+UNCOMPRESSED = 3
+EXTERNAL = 0x80
+
+MIN_SECTION = MIN_Y >> 4
+
+logger = logging.getLogger("devon.world")
+
+
+class RegionError(Exception):
+    pass
+
+
+def decompress(compression: int, data: bytes) -> bytes:
+    if compression == ZLIB:
+        return zlib.decompress(data)
+    if compression == GZIP:
+        return gzip.decompress(data)
+    if compression == UNCOMPRESSED:
+        return bytes(data)
+
+    raise RegionError(f"Unsupported chunk compression {compression}")
+
+
+class RegionFile:
+    """A memory mapped ``.mca`` file of 32x32 chunks.
+
+    Only the offset table is read up front, chunks are located through it and
+    decompressed when they are read.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.map) < HEADER_SIZE:
+            self.map.close()
+            raise RegionError(f"{path} is too short for a region file")
+
+        self.locations = np.frombuffer(self.map, dtype=">u4", count=REGION_CHUNKS**2)
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        return bool(self.locations[self.index(*position)])
+
+    @staticmethod
+    def index(x: int, z: int) -> int:
+        return (x % REGION_CHUNKS) + (z % REGION_CHUNKS) * REGION_CHUNKS
+
+    def read(self, x: int, z: int) -> bytes | None:
+        """The uncompressed NBT of a chunk, or None if it was never saved"""
+        location = int(self.locations[self.index(x, z)])
+        if not location:
+            return None
+
+        start = (location >> 8) * SECTOR_SIZE
+        if start + 5 > len(self.map):
+            raise RegionError(f"Chunk {x}, {z} is outside of {self.path}")
+
+        length, compression = struct.unpack_from(">IB", self.map, start)
+        if compression & EXTERNAL:
+            external = self.path.with_name(f"c.{x}.{z}.mcc")
+            return decompress(compression & ~EXTERNAL, external.read_bytes())
+
+        return decompress(compression, self.map[start + 5 : start + 4 + length])
+
+    def close(self) -> None:
+        del self.locations
+        self.map.close()
+
+
+class RegionStorage:
+    """The region files of a dimension, opened as chunks are read from them"""
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+        self.files: dict[tuple[int, int], RegionFile | None] = dict()
+
+    def __getstate__(self) -> dict:
+        # memory maps can't be pickled, every process opens its own
+        return {"directory": self.directory, "files": dict()}
+
+    def region(self, x: int, z: int) -> RegionFile | None:
+        key = x >> 5, z >> 5
+        if key not in self.files:
+            path = self.directory / f"r.{key[0]}.{key[1]}.mca"
+            self.files[key] = RegionFile(path) if path.exists() else None
+
+        return self.files[key]
+
+    def read(self, x: int, z: int) -> bytes | None:
+        region = self.region(x, z)
+        return None if region is None else region.read(x, z)
+
+    def close(self) -> None:
+        for region in self.files.values():
+            if region is not None:
+                region.close()
+
+        self.files.clear()
+
+
+def decode_blocks(section: nbt.Compound, states: BlockStates) -> np.ndarray:
+    """The block states of a saved section, indexed ``[y, z, x]``"""
+    block_states = section.get("block_states")
+
+    ids = list()
+    for entry in block_states.get("palette").value:
+        properties = dict()
+        if (tag := entry.get("Properties")) is not None:
+            properties = {child.name: child.value for child in tag.value}
+
+        ids.append(states.lookup(entry.get("Name").value, properties))
+
+    palette = np.array(ids, dtype=np.uint16)
+    data = block_states.get("data")
+    if data is None:
+        return np.full((16, 16, 16), palette[0], dtype=np.uint16)
+
+    bits = max(4, (len(palette) - 1).bit_length())
+    indices = unpack_bits(np.frombuffer(data.value, dtype=np.int64), bits, 4096)
+    return palette[indices].reshape(16, 16, 16)
+
+
+class AnvilSource:
+    """Reads chunks from region files, generating the ones that were never saved"""
+
+    def __init__(
+        self,
+        storage: RegionStorage,
+        states: BlockStates,
+        fallback: Generator,
+    ) -> None:
+        self.storage = storage
+        self.states = states
+        self.fallback = fallback
+
+    def generate(self, chunk_x: int, chunk_z: int) -> np.ndarray:
+        try:
+            data = self.storage.read(chunk_x, chunk_z)
+            if data is not None:
+                return self.decode(data)
+        except Exception:
+            logger.exception("Failed to load chunk %d, %d", chunk_x, chunk_z)
+
+        return self.fallback.generate(chunk_x, chunk_z)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        chunk = nbt.Compound.from_bytes(data, root_tag=True)
+        sections = chunk.get("sections")
+        if sections is None:
+            raise RegionError("Chunks saved before 1.18 are not supported")
+
+        blocks = np.zeros((SECTION_COUNT * 16, 16, 16), dtype=np.uint16)
+        for section in sections.value:
+            index = section.get("Y").value - MIN_SECTION
+            if 0 <= index < SECTION_COUNT and section.get("block_states") is not None:
+                blocks[index * 16 : index * 16 + 16] = decode_blocks(
+                    section, self.states
+                )
+
+        return blocks
@@ -0,0 +1,153 @@
+import functools
+import math
+from typing import TYPE_CHECKING
+
+from src.packets.play import (
+    CHUNK_BATCH_START,
+    chunk_batch_finished,
+    set_center_chunk,
+    unload_chunk,
+)
+from src.world.world import World
+
+if TYPE_CHECKING:
+    from src.player import Player
+
+VIEW_DISTANCE = 10
+CHUNKS_PER_TICK = 16
+MAX_UNACKNOWLEDGED_BATCHES = 4
+LOOKAHEAD = 4
+PREFETCH_DISTANCE = 2
+
+
+@functools.cache
+def spiral(radius: int) -> tuple[tuple[int, int], ...]:
+    """Chunk offsets within ``radius`` of the center, ring by ring going outwards"""
+    offsets = [(0, 0)]
+    for ring in range(1, radius + 1):
+        x, z = -ring, -ring
+        for dx, dz in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+            for _ in range(ring * 2):
+                offsets.append((x, z))
+                x += dx
+                z += dz
+
+    return tuple(offsets)
+
+
+class ChunkStreamer:
+    """Sends the chunks around a player, a limited number per tick, and unloads the
+    ones left behind as the player moves.
+
+    Chunks are sent as soon as the world has them ready, and the chunks ahead of the
+    direction the player is moving in are requested before they come into view.
+    Chunks in view are pinned in the world's cache until they are unloaded.
+    """
+
+    def __init__(
+        self,
+        player: "Player",
+        world: World,
+        view_distance: int = VIEW_DISTANCE,
+        chunks_per_tick: int = CHUNKS_PER_TICK,
+    ) -> None:
+        self.player = player
+        self.world = world
+        self.view_distance = view_distance
+        self.chunks_per_tick = chunks_per_tick
+
+        self.center: tuple[int, int] | None = None
+        self.loaded: set[tuple[int, int]] = set()
+        self.pending: list[tuple[int, int]] = list()
+        self.unacknowledged_batches = 0
+
+    def update(self, x: float, z: float) -> None:
+        center = math.floor(x) >> 4, math.floor(z) >> 4
+        if center == self.center:
+            return
+
+        previous = self.center
+        self.center = center
+        center_x, center_z = center
+
+        needed = [
+            (center_x + dx, center_z + dz) for dx, dz in spiral(self.view_distance)
+        ]
+        needed_set = set(needed)
+
+        packets = [set_center_chunk(center_x, center_z)]
+        for chunk_x, chunk_z in self.loaded - needed_set:
+            packets.append(unload_chunk(chunk_x, chunk_z))
+            self.world.unpin(chunk_x, chunk_z)
+
+        self.loaded &= needed_set
+        self.pending = [chunk for chunk in needed if chunk not in self.loaded]
+        self.world.request(self.pending)
+        if previous is not None:
+            self.prefetch(previous, needed_set)
+
+        self.player.send(*packets)
+
+    def prefetch(self, previous: tuple[int, int], needed: set[tuple[int, int]]) -> None:
+        """Requests the view around where the player is heading"""
+        step_x = (self.center[0] > previous[0]) - (self.center[0] < previous[0])
+        step_z = (self.center[1] > previous[1]) - (self.center[1] < previous[1])
+        ahead_x = self.center[0] + step_x * PREFETCH_DISTANCE
+        ahead_z = self.center[1] + step_z * PREFETCH_DISTANCE
+
+        self.world.request(
+            [
+                chunk
+                for dx, dz in spiral(self.view_distance)
+                if (chunk := (ahead_x + dx, ahead_z + dz)) not in needed
+            ]
+        )
+
+    def acknowledge_batch(self, chunks_per_tick: float) -> None:
+        self.unacknowledged_batches = max(0, self.unacknowledged_batches - 1)
+        # a rate sent by the client, NaN and infinity are ignored
+        if math.isfinite(chunks_per_tick) and chunks_per_tick > 0:
+            self.chunks_per_tick = max(
+                1, math.ceil(min(CHUNKS_PER_TICK, chunks_per_tick))
+            )
+
+    def tick(self) -> None:
+        if (
+            not self.pending
+            or self.unacknowledged_batches >= MAX_UNACKNOWLEDGED_BATCHES
+        ):
+            return
+
+        batch = dict()
+        waiting = list()
+        for x, z in self.pending[: self.chunks_per_tick * LOOKAHEAD]:
+            chunk = self.world.ready(x, z)
+            if chunk is None:
+                waiting.append((x, z))
+            elif len(batch) < self.chunks_per_tick:
+                batch[x, z] = chunk
+
+        # chunks may have been evicted from the cache since they were requested
+        self.world.request(waiting)
+        if not batch:
+            return
+
+        self.pending = [chunk for chunk in self.pending if chunk not in batch]
+        self.loaded.update(batch)
+        for x, z in batch:
+            self.world.pin(x, z)
+        self.unacknowledged_batches += 1
+
+        self.player.send(
+            CHUNK_BATCH_START,
+            *[chunk.packet() for chunk in batch.values()],
+            chunk_batch_finished(len(batch)),
+        )
+
+    def close(self) -> None:
+        """Releases the chunks in view, once the player is gone"""
+        for x, z in self.loaded:
+            self.world.unpin(x, z)
+
+        self.loaded.clear()
+        self.pending.clear()
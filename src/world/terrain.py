@@ -0,0 +1,111 @@
+import numpy as np
+
+from src.world.chunk import MIN_Y, SECTION_COUNT
+
+HEIGHT = SECTION_COUNT * 16
+SEA_LEVEL = 62
+
+STONE = 1
+GRASS_BLOCK = 9
+DIRT = 10
+BEDROCK = 79
+WATER = 80
+SAND = 112
+
+DIRT_DEPTH = 3
+
+
+def lattice(seed: int, x: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Pseudo random values in [0, 1) for integer lattice points"""
+    h = x.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    h ^= z.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+    h ^= np.uint64(seed & 0xFFFFFFFFFFFFFFFF)
+
+    # splitmix64 finalizer
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def value_noise(seed: int, x: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Smoothly interpolated lattice values, in [0, 1)"""
+    x0 = np.floor(x)
+    z0 = np.floor(z)
+    u = x - x0
+    v = z - z0
+    u = u * u * (3 - 2 * u)
+    v = v * v * (3 - 2 * v)
+
+    xi = x0.astype(np.int64)
+    zi = z0.astype(np.int64)
+    top = lattice(seed, xi, zi) * (1 - u) + lattice(seed, xi + 1, zi) * u
+    bottom = lattice(seed, xi, zi + 1) * (1 - u) + lattice(seed, xi + 1, zi + 1) * u
+    return top * (1 - v) + bottom * v
+
+
+def fractal_noise(
+    seed: int, x: np.ndarray, z: np.ndarray, scale: float, octaves: int
+) -> np.ndarray:
+    """Octaves of value noise, each at twice the frequency and half the amplitude"""
+    total = np.zeros(x.shape)
+    amplitude = 1.0
+    frequency = 1 / scale
+    for octave in range(octaves):
+        total += value_noise(seed + octave, x * frequency, z * frequency) * amplitude
+        amplitude /= 2
+        frequency *= 2
+
+    return total / (2 - 2 ** (1 - octaves))
+
+
+class FlatGenerator:
+    """Solid ground up to ``height``"""
+
+    def __init__(self, height: int = 64, block: int = 17) -> None:
+        self.height = height
+        self.block = block
+
+    def generate(self, chunk_x: int, chunk_z: int) -> np.ndarray:
+        blocks = np.zeros((HEIGHT, 16, 16), dtype=np.uint16)
+        blocks[: self.height - MIN_Y] = self.block
+        return blocks
+
+
+class TerrainGenerator:
+    """Rolling hills, beaches and seas from seeded noise.
+
+    ``generate`` returns the block states of a whole chunk indexed ``[y, z, x]``, it
+    only depends on the seed and the chunk position so it can run in any process.
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        self.seed = seed
+
+    def heightmap(self, chunk_x: int, chunk_z: int) -> np.ndarray:
+        x, z = np.meshgrid(
+            chunk_x * 16 + np.arange(16, dtype=np.float64),
+            chunk_z * 16 + np.arange(16, dtype=np.float64),
+        )
+
+        continents = fractal_noise(self.seed, x, z, scale=512, octaves=2)
+        hills = fractal_noise(self.seed + 16, x, z, scale=96, octaves=4)
+        height = SEA_LEVEL - 16 + continents * 32 + (hills - 0.5) * 24 * continents
+        return np.clip(height.astype(np.int64), MIN_Y + 1, MIN_Y + HEIGHT - 1)
+
+    def generate(self, chunk_x: int, chunk_z: int) -> np.ndarray:
+        height = self.heightmap(chunk_x, chunk_z)[np.newaxis]
+        y = np.arange(MIN_Y, MIN_Y + HEIGHT)[:, np.newaxis, np.newaxis]
+
+        surface = np.where(height <= SEA_LEVEL + 1, SAND, GRASS_BLOCK)
+        filler = np.where(height <= SEA_LEVEL + 1, SAND, DIRT)
+
+        blocks = np.zeros((HEIGHT, 16, 16), dtype=np.uint16)
+        blocks[: SEA_LEVEL - MIN_Y + 1] = WATER
+        blocks = np.where(y <= height, surface, blocks)
+        blocks = np.where(y < height, filler, blocks)
+        blocks = np.where(y < height - DIRT_DEPTH, STONE, blocks)
+        blocks[0] = BEDROCK
+        return blocks.astype(np.uint16)
@@ -0,0 +1,177 @@
+import logging
+import math
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from src.broadcast import broadcast
+from src.packets.packet import PacketWriter
+from src.packets.play import (
+    add_player_info,
+    remove_entities,
+    remove_player_info,
+    set_head_rotation,
+    spawn_player,
+    teleport_entity,
+)
+
+if TYPE_CHECKING:
+    from src.player import Player
+
+TRACKING_RANGE = 4
+
+logger = logging.getLogger("devon.world")
+
+
+def chunk_of(x: float, z: float) -> tuple[int, int]:
+    return math.floor(x) >> 4, math.floor(z) >> 4
+
+
+def show(player: "Player") -> list[PacketWriter]:
+    return [
+        add_player_info(player.uuid, player.name),
+        spawn_player(
+            player.entity_id, player.uuid, *player.pos, player.yaw, player.pitch
+        ),
+    ]
+
+
+def hide(player: "Player") -> list[PacketWriter]:
+    return [remove_entities([player.entity_id]), remove_player_info([player.uuid])]
+
+
+class EntityTracker:
+    """Keeps players in a spatial hash keyed by chunk and applies their movement once
+    per tick, sending it only to the players within ``tracking_range`` chunks.
+
+    Players are spawned for each other when they come within range and removed when
+    they leave it, ``visible`` holds the players each one has been shown.
+    """
+
+    def __init__(self, tracking_range: int = TRACKING_RANGE) -> None:
+        self.tracking_range = tracking_range
+        self.cells: dict[tuple[int, int], set["Player"]] = dict()
+        self.cell_of: dict["Player", tuple[int, int]] = dict()
+        self.moved: dict["Player", None] = dict()
+        self.visible: dict["Player", set["Player"]] = dict()
+
+    def add(self, player: "Player") -> None:
+        cell = chunk_of(player.pos[0], player.pos[2])
+        self.cells.setdefault(cell, set()).add(player)
+        self.cell_of[player] = cell
+
+        self.visible[player] = set()
+        for other in list(self.nearby(cell)):
+            if other is not player:
+                self.link(player, other)
+
+    def remove(self, player: "Player") -> None:
+        cell = self.cell_of.pop(player, None)
+        if cell is not None:
+            self.leave_cell(player, cell)
+
+        self.moved.pop(player, None)
+        for other in self.visible.pop(player, ()):
+            self.visible[other].discard(player)
+            other.send(*hide(player))
+
+    def link(self, player: "Player", other: "Player") -> None:
+        """Shows two players to each other"""
+        self.visible[player].add(other)
+        self.visible[other].add(player)
+        player.send(*show(other))
+        other.send(*show(player))
+
+    def unlink(self, player: "Player", other: "Player") -> None:
+        self.visible[player].discard(other)
+        self.visible[other].discard(player)
+        player.send(*hide(other))
+        other.send(*hide(player))
+
+    def leave_cell(self, player: "Player", cell: tuple[int, int]) -> None:
+        players = self.cells[cell]
+        players.discard(player)
+        if not players:
+            del self.cells[cell]
+
+    def mark_moved(self, player: "Player") -> None:
+        if player in self.cell_of:
+            self.moved[player] = None
+
+    def players(
+        self, predicate: Callable[["Player"], bool] | None = None
+    ) -> Iterator["Player"]:
+        """Every player in the world, or the ones matching ``predicate``"""
+        if predicate is None:
+            return iter(list(self.cell_of))
+
+        return (player for player in list(self.cell_of) if predicate(player))
+
+    def nearby(
+        self, cell: tuple[int, int], radius: int | None = None
+    ) -> Iterator["Player"]:
+        """The players within ``radius`` chunks of ``cell``, or the tracking range"""
+        if radius is None:
+            radius = self.tracking_range
+
+        cell_x, cell_z = cell
+        cells = self.cells
+        if (2 * radius + 1) ** 2 > len(cells):
+            # fewer occupied cells than cells in range
+            for (x, z), players in list(cells.items()):
+                if abs(x - cell_x) <= radius and abs(z - cell_z) <= radius:
+                    yield from players
+
+            return
+
+        for dx in range(-radius, radius + 1):
+            for dz in range(-radius, radius + 1):
+                players = cells.get((cell_x + dx, cell_z + dz))
+                if players:
+                    yield from players
+
+    def tick(self) -> None:
+        moved, self.moved = self.moved, dict()
+
+        for player in moved:
+            try:
+                self.update(player)
+            except Exception:
+                logger.exception("Failed to apply the movement of %s", player.name)
+
+    def update(self, player: "Player") -> None:
+        if player not in self.cell_of:
+            # removed earlier in the same tick
+            return
+
+        rotated = player.apply_movement()
+
+        cell = chunk_of(player.pos[0], player.pos[2])
+        if cell != self.cell_of[player]:
+            self.leave_cell(player, self.cell_of[player])
+            self.cells.setdefault(cell, set()).add(player)
+            self.cell_of[player] = cell
+
+        if player.streamer is not None:
+            player.streamer.update(player.pos[0], player.pos[2])
+
+        packets = [
+            teleport_entity(
+                player.entity_id,
+                *player.pos,
+                player.yaw,
+                player.pitch,
+                player.on_ground,
+            )
+        ]
+        if rotated:
+            packets.append(set_head_rotation(player.entity_id, player.yaw))
+
+        visible = self.visible[player]
+        in_range = {other for other in self.nearby(cell) if other is not player}
+        # the players just shown this one get its current position when spawning it
+        watching = visible & in_range
+        for other in visible - in_range:
+            self.unlink(player, other)
+        for other in in_range - visible:
+            self.link(player, other)
+
+        broadcast(packets, watching, droppable=True)
@@ -0,0 +1,193 @@
+import collections
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Protocol
+
+import numpy as np
+
+from src.world.chunk import Chunk, ChunkSection, SECTION_COUNT
+
+CACHE_SIZE = 1024
+# chunks generated in the server process per tick when there are no workers
+SYNC_CHUNKS_PER_TICK = 4
+OVERWORLD = "minecraft:overworld"
+
+ChunkKey = tuple[str, int, int]
+
+logger = logging.getLogger("devon.world")
+
+
+class Generator(Protocol):
+    def generate(self, chunk_x: int, chunk_z: int) -> np.ndarray: ...
+
+
+# the generator of a generation process, set once when the process starts
+process_generator: Generator | None = None
+
+
+def set_process_generator(generator: Generator) -> None:
+    global process_generator
+    process_generator = generator
+
+    # Ctrl+C reaches the whole process group, the server shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def generate_chunk(generator: Generator, x: int, z: int) -> Chunk:
+    """Generates a chunk and encodes its sections"""
+    blocks = generator.generate(x, z)
+    chunk = Chunk(x, z, [ChunkSection(s) for s in np.split(blocks, SECTION_COUNT)])
+    chunk.data()
+    return chunk
+
+
+def generate_in_process(x: int, z: int) -> Chunk:
+    return generate_chunk(process_generator, x, z)
+
+
+class ChunkCache:
+    """The most recently used chunks of every dimension.
+
+    Pinned chunks, the ones in view of some player, are kept outside of the LRU and
+    don't count towards its size until they are unpinned.
+    """
+
+    def __init__(self, size: int = CACHE_SIZE) -> None:
+        self.size = size
+        self.chunks: collections.OrderedDict[ChunkKey, Chunk] = (
+            collections.OrderedDict()
+        )
+        self.pinned: dict[ChunkKey, Chunk] = dict()
+        self.pins: collections.Counter[ChunkKey] = collections.Counter()
+
+    def __len__(self) -> int:
+        return len(self.chunks) + len(self.pinned)
+
+    def __contains__(self, key: ChunkKey) -> bool:
+        return key in self.pinned or key in self.chunks
+
+    def get(self, key: ChunkKey) -> Chunk | None:
+        chunk = self.pinned.get(key)
+        if chunk is None:
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                self.chunks.move_to_end(key)
+
+        return chunk
+
+    def put(self, key: ChunkKey, chunk: Chunk) -> None:
+        if key in self.pins:
+            self.pinned[key] = chunk
+            return
+
+        self.chunks[key] = chunk
+        self.chunks.move_to_end(key)
+        while len(self.chunks) > self.size:
+            self.chunks.popitem(last=False)
+
+    def pin(self, key: ChunkKey) -> None:
+        self.pins[key] += 1
+        if key in self.chunks:
+            self.pinned[key] = self.chunks.pop(key)
+
+    def unpin(self, key: ChunkKey) -> None:
+        self.pins[key] -= 1
+        if self.pins[key] > 0:
+            return
+
+        del self.pins[key]
+        chunk = self.pinned.pop(key, None)
+        if chunk is not None:
+            self.put(key, chunk)
+
+
+class World:
+    """A dimension whose chunks are generated on demand.
+
+    With ``workers`` chunks are generated in that many processes, ``request`` starts
+    generating them and ``ready`` returns them once they are done. Without workers
+    they are queued and ``tick`` generates ``SYNC_CHUNKS_PER_TICK`` of them at a time,
+    so a player changing chunk doesn't stall the tick generating their whole view.
+    """
+
+    def __init__(
+        self,
+        generator: Generator,
+        workers: int = 0,
+        cache: ChunkCache | None = None,
+        dimension: str = OVERWORLD,
+    ) -> None:
+        self.generator = generator
+        self.executor: ProcessPoolExecutor | None = None
+        if workers > 0:
+            self.executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=set_process_generator,
+                initargs=(generator,),
+            )
+
+        self.cache = ChunkCache() if cache is None else cache
+        self.dimension = dimension
+        self.generating: set[tuple[int, int]] = set()
+        self.queued: dict[tuple[int, int], None] = dict()
+
+    def ready(self, x: int, z: int) -> Chunk | None:
+        return self.cache.get((self.dimension, x, z))
+
+    def pin(self, x: int, z: int) -> None:
+        self.cache.pin((self.dimension, x, z))
+
+    def unpin(self, x: int, z: int) -> None:
+        self.cache.unpin((self.dimension, x, z))
+
+    def get_chunk(self, x: int, z: int) -> Chunk:
+        chunk = self.ready(x, z)
+        if chunk is None:
+            chunk = generate_chunk(self.generator, x, z)
+            self.cache.put((self.dimension, x, z), chunk)
+
+        return chunk
+
+    def request(self, positions: list[tuple[int, int]]) -> None:
+        from twisted.internet import reactor
+
+        for x, z in positions:
+            if (x, z) in self.generating or (self.dimension, x, z) in self.cache:
+                continue
+
+            if self.executor is None:
+                self.queued[x, z] = None
+                continue
+
+            self.generating.add((x, z))
+            future = self.executor.submit(generate_in_process, x, z)
+            future.add_done_callback(
+                lambda f, key=(x, z): reactor.callFromThread(self.generated, key, f)
+            )
+
+    def tick(self) -> None:
+        """Generates the oldest chunks queued without workers"""
+        for _ in range(min(SYNC_CHUNKS_PER_TICK, len(self.queued))):
+            position = next(iter(self.queued))
+            del self.queued[position]
+            self.get_chunk(*position)
+
+    def generated(self, position: tuple[int, int], future: Future) -> None:
+        self.generating.discard(position)
+        if future.cancelled():
+            return
+
+        try:
+            chunk = future.result()
+        except Exception:
+            logger.exception("Failed to generate chunk %s", position)
+            return
+
+        self.cache.put((self.dimension, *position), chunk)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.buffer import Buffer
+from src.world.chunk import (
+    BIOME_BITS,
+    BLOCK_BITS,
+    ChunkSection,
+    encode_paletted,
+    pack_bits,
+    unpack_bits,
+)
+
+
+def decode_paletted(data: bytes, bits: tuple[int, int, int], count: int) -> np.ndarray:
+    buffer = Buffer(data)
+    entry_bits = buffer.unpack_ubyte()
+    if entry_bits == 0:
+        value = buffer.unpack_varint()
+        assert buffer.unpack_varint() == 0
+        return np.full(count, value)
+
+    palette = None
+    if entry_bits != bits[2]:
+        palette = [buffer.unpack_varint() for _ in range(buffer.unpack_varint())]
+
+    longs = np.frombuffer(buffer.read(buffer.unpack_varint() * 8), dtype=">u8")
+    assert not buffer.read()
+
+    indices = unpack_bits(longs, entry_bits, count).astype(np.int64)
+    return indices if palette is None else np.array(palette)[indices]
+
+
+@pytest.mark.parametrize("bits", [1, 4, 5, 8, 15])
+def test_pack_bits_round_trip(bits):
+    values = np.random.default_rng(bits).integers(0, 1 << bits, 4096)
+    packed = pack_bits(values, bits)
+
+    assert packed.size == -(-4096 // (64 // bits))
+    assert np.array_equal(unpack_bits(packed, bits, 4096), values)
+
+
+@pytest.mark.parametrize("states", [1, 2, 16, 17, 256, 257, 4096])
+def test_encode_paletted_round_trip(states):
+    rng = np.random.default_rng(states)
+    palette = rng.choice(30000, states, replace=False)
+    blocks = rng.permutation(np.resize(palette, 4096)).reshape(16, 16, 16)
+
+    decoded = decode_paletted(encode_paletted(blocks, BLOCK_BITS), BLOCK_BITS, 4096)
+    assert np.array_equal(decoded, blocks.ravel())
+
+
+def test_section_encoding_is_cached():
+    section = ChunkSection()
+    section.set_block(1, 2, 3, 9)
+    encoded = section.encode()
+
+    assert section.encode() is encoded
+    assert Buffer(encoded).unpack_short() == 1
+
+    section.set_block(1, 2, 3, 0)
+    assert section.encode() != encoded
+
+
+def test_biomes_round_trip():
+    biomes = np.arange(64).reshape(4, 4, 4) % 5
+    decoded = decode_paletted(encode_paletted(biomes, BIOME_BITS), BIOME_BITS, 64)
+    assert np.array_equal(decoded, biomes.ravel())
@@ -0,0 +1,56 @@
+import zlib
+
+import pytest
+
+from src.compression import MAX_DATA_LENGTH, Compression
+from src.framing import FrameError
+from src.structs import VarInt
+
+
+def compressed_frame(payload: bytes, data_length: int) -> memoryview:
+    return memoryview(VarInt.pack(data_length) + zlib.compress(payload))
+
+
+def test_round_trip():
+    compression = Compression(threshold=16)
+    payload = bytes(range(256)) * 4
+
+    framed = memoryview(compression.frame(payload))
+    length, offset = VarInt.unpack_from(framed, 0)
+    assert length == len(framed) - offset
+    assert compression.unwrap(framed[offset:]) == payload
+
+
+def test_uncompressed_frame():
+    compression = Compression(threshold=16)
+    assert compression.unwrap(memoryview(b"\x00\x01abc")) == b"\x01abc"
+
+
+def test_decompression_bomb():
+    # declares 1 KiB but inflates to 64 MiB
+    bomb = compressed_frame(bytes(64 * 1024 * 1024), 1024)
+    with pytest.raises(FrameError):
+        Compression.inflate(bomb[2:], 1024)
+
+
+def test_shorter_than_declared():
+    data = compressed_frame(bytes(100), 1024)
+    with pytest.raises(FrameError):
+        Compression.inflate(data[2:], 1024)
+
+
+def test_declared_length_over_the_limit():
+    compression = Compression(threshold=16)
+    with pytest.raises(FrameError):
+        compression.unwrap(compressed_frame(bytes(100), MAX_DATA_LENGTH + 1))
+
+
+def test_compressed_below_threshold():
+    compression = Compression(threshold=256)
+    with pytest.raises(FrameError):
+        compression.unwrap(compressed_frame(bytes(100), 100))
+
+
+def test_invalid_data():
+    with pytest.raises(FrameError):
+        Compression.inflate(memoryview(b"not zlib"), 1024)
@@ -0,0 +1,64 @@
+import pytest
+
+from src.framing import FrameDecoder, FrameError
+from src.structs import VarInt
+
+
+def frame(payload: bytes) -> bytes:
+    return VarInt.pack(len(payload)) + payload
+
+
+def test_split_frame():
+    decoder = FrameDecoder()
+    data = frame(bytes(range(200)))
+
+    for index in range(len(data) - 1):
+        decoder.feed(data[index : index + 1])
+        assert decoder.next_frame() is None
+
+    decoder.feed(data[-1:])
+    assert decoder.next_frame() == bytes(range(200))
+    assert decoder.next_frame() is None
+
+
+def test_coalesced_frames():
+    decoder = FrameDecoder()
+    payloads = [b"\x00", b"\x01abc", bytes(300)]
+    decoder.feed(b"".join(map(frame, payloads)) + frame(b"\x02rest")[:3])
+
+    frames = [bytes(frame) for frame in decoder]
+    assert frames == payloads
+
+    decoder.feed(frame(b"\x02rest")[3:])
+    assert decoder.next_frame() == b"\x02rest"
+
+
+def test_frames_stay_valid_after_feeding():
+    decoder = FrameDecoder()
+    decoder.feed(frame(b"\x00first") + frame(b"\x01second")[:2])
+
+    first = decoder.next_frame()
+    decoder.feed(frame(b"\x01second")[2:])
+    assert decoder.next_frame() == b"\x01second"
+    assert first == b"\x00first"
+
+
+def test_empty_frame():
+    decoder = FrameDecoder()
+    decoder.feed(b"\x00")
+    with pytest.raises(FrameError):
+        decoder.next_frame()
+
+
+def test_oversize_frame():
+    decoder = FrameDecoder(max_frame_size=100)
+    decoder.feed(VarInt.pack(101))
+    with pytest.raises(FrameError):
+        decoder.next_frame()
+
+
+def test_long_length_prefix():
+    decoder = FrameDecoder()
+    decoder.feed(b"\x80\x80\x80")
+    with pytest.raises(FrameError):
+        decoder.next_frame()
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from src import nbt
+from src.buffer import Buffer
+
+ROOT = Path(__file__).resolve().parent.parent
+REGISTRY = (ROOT / "registry_info.packet").read_bytes()
+
+
+@pytest.fixture(scope="module")
+def lazy() -> nbt.LazyCompound:
+    return nbt.LazyCompound(REGISTRY, named=False)
+
+
+@pytest.fixture(scope="module")
+def eager() -> nbt.Compound:
+    return nbt.Compound.from_buffer(Buffer(REGISTRY), named=False, root_tag=True)
+
+
+def walk(tag: nbt.Tag, path: str = ""):
+    """Every tag inside ``tag`` with its path"""
+    if isinstance(tag, nbt.Compound):
+        for child in tag.value:
+            child_path = f"{path}/{child.name}" if path else child.name
+            yield child_path, child
+            yield from walk(child, child_path)
+    elif isinstance(tag, nbt.List):
+        for index, element in enumerate(tag.value):
+            yield f"{path}[{index}]", element
+            yield from walk(element, f"{path}[{index}]")
+
+
+def test_matches_eager_parser(lazy, eager):
+    paths = 0
+    for path, tag in walk(eager):
+        assert path in lazy
+        assert lazy.raw(path) == tag.get_value(), path
+        paths += 1
+
+    assert paths > 1000
+
+
+def test_names_containing_the_separator(lazy, eager):
+    biomes = eager.get("minecraft:worldgen/biome").get("value")
+    path = "minecraft:worldgen/biome/value[0]/element"
+
+    assert "minecraft:worldgen/biome" in lazy
+    assert lazy.get(path).get_value() == biomes.value[0].get("element").get_value()
+
+
+def test_missing_path(lazy):
+    assert "minecraft:worldgen/missing" not in lazy
+    assert "minecraft:dimension_type/value[100]" not in lazy
+    with pytest.raises(KeyError):
+        lazy.get("minecraft:chat_type/missing")
+
+
+@pytest.mark.parametrize("path", ["a[b", "a]", "minecraft:dimension_type[x]"])
+def test_malformed_path(lazy, path):
+    assert path not in lazy
+    with pytest.raises(KeyError, match="malformed part"):
+        lazy.get(path)
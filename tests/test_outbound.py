@@ -0,0 +1,64 @@
+from twisted.internet.testing import StringTransport
+
+from src.outbound import DROP_THRESHOLD, MAX_QUEUED, OutboundQueue
+
+KIB = bytes(1024)
+
+
+def queue() -> tuple[OutboundQueue, StringTransport]:
+    transport = StringTransport()
+    return OutboundQueue(transport), transport
+
+
+def test_flush_writes_everything_queued():
+    outbound, transport = queue()
+    outbound.push([b"a", b"bc"])
+    outbound.push([b"d"], droppable=True)
+
+    outbound.flush()
+    assert transport.value() == b"abcd"
+    assert len(outbound) == 0
+
+
+def test_paused_queue_waits():
+    outbound, transport = queue()
+    outbound.pauseProducing()
+    outbound.push([b"abc"])
+
+    outbound.flush()
+    assert transport.value() == b""
+
+    outbound.resumeProducing()
+    assert transport.value() == b"abc"
+
+
+def test_droppable_frames_are_dropped_over_1_mib():
+    outbound, transport = queue()
+    outbound.pauseProducing()
+    outbound.push([KIB] * (DROP_THRESHOLD // len(KIB) - 1))
+    outbound.push([b"moved"], droppable=True)
+    outbound.push([KIB], droppable=True)
+
+    assert outbound.dropped == 1
+    assert len(outbound) == DROP_THRESHOLD - len(KIB) + len(b"moved")
+
+    # a frame that has to be sent discards the droppable ones still waiting
+    outbound.push([KIB])
+    assert outbound.dropped == 2
+    assert len(outbound) == DROP_THRESHOLD
+    assert not transport.disconnecting
+
+
+def test_connection_is_aborted_over_8_mib():
+    outbound, transport = queue()
+    outbound.pauseProducing()
+    outbound.push([KIB] * (MAX_QUEUED // len(KIB)))
+    assert not transport.disconnecting
+
+    outbound.push([b"x"])
+    assert transport.disconnecting
+    assert outbound.closed
+    assert len(outbound) == 0
+
+    outbound.resumeProducing()
+    assert transport.value() == b""
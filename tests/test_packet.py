@@ -0,0 +1,24 @@
+from twisted.internet import defer
+
+from src.compression import Compression
+from src.packets.packet import StaticPacket
+
+
+class SyncCompression(Compression):
+    """Compresses in a Deferred that has already fired, like a synchronous thread"""
+
+    def frame(self, payload: bytes) -> defer.Deferred:
+        return defer.succeed(self.compress(payload))
+
+
+def test_static_packet_with_finished_compression():
+    compression = SyncCompression(threshold=16)
+    packet = StaticPacket.from_body(0x01, bytes(64))
+
+    framed = packet.frame(compression)
+    results = list()
+    framed.addCallback(results.append)
+
+    assert results == [compression.compress(packet.payload)]
+    assert packet.compressing == dict()
+    assert packet.frame(compression) == results[0]
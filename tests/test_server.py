@@ -0,0 +1,48 @@
+import struct
+
+from twisted.internet.testing import StringTransport
+
+from main import STATUS_BURST, ServerFactory
+from src.stages.status import ServerStatus
+from src.structs import Long, String, VarInt
+
+
+def frame(packet_id: int, body: bytes = b"") -> bytes:
+    payload = VarInt.pack(packet_id) + body
+    return VarInt.pack(len(payload)) + payload
+
+
+STATUS_HANDSHAKE = frame(
+    0x00,
+    VarInt.pack(765) + String.pack("localhost") + struct.pack(">H", 25565) + b"\x01",
+)
+STATUS_REQUEST = frame(0x00)
+PING_REQUEST = frame(0x01, Long.pack(1))
+
+
+class TCPTransport(StringTransport):
+    """Like a TCP connection, aborting doesn't set ``disconnecting``"""
+
+    def abortConnection(self) -> None:
+        self.disconnected = True
+
+
+def connect(factory: ServerFactory) -> StringTransport:
+    server = factory.buildProtocol(None)
+    transport = TCPTransport()
+    server.makeConnection(transport)
+    server.dataReceived(STATUS_HANDSHAKE + STATUS_REQUEST + PING_REQUEST)
+    return transport
+
+
+def test_status_is_answered():
+    factory = ServerFactory(ServerStatus(max_players=20))
+    assert connect(factory).value()
+
+
+def test_rate_limited_status_is_not_answered():
+    factory = ServerFactory(ServerStatus(max_players=20))
+    for _ in range(STATUS_BURST):
+        connect(factory)
+
+    assert connect(factory).value() == b""
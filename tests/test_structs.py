@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.structs import BaseStruct, Position, VarInt, VarLong
+
+
+@pytest.mark.parametrize("cls", [VarInt, VarLong])
+@pytest.mark.parametrize("count", [0, 10, 100, 1000])
+def test_bulk_codec_matches_single_values(cls, count):
+    limit = 1 << (cls.bits - 1)
+    values = [random.randrange(-limit, limit) for _ in range(count)]
+    values[: count // 2] = [random.randrange(0x4000) for _ in range(count // 2)]
+    encoded = b"".join(map(cls.pack, values))
+
+    assert cls.pack_many(values) == encoded
+    assert cls.pack_many(np.array(values, dtype=np.int64)) == encoded
+    assert cls.unpack_many(memoryview(b"\x00" + encoded), count, 1) == (
+        values,
+        len(encoded) + 1,
+    )
+
+
+def test_bulk_unpack_rejects_long_values():
+    data = memoryview(bytes(10) + b"\x80" * 5 + b"\x01" + bytes(100))
+    with pytest.raises(ValueError):
+        VarInt.unpack_many(data, 100)
+
+
+@pytest.mark.parametrize(
+    "position",
+    [(0, 0, 0), (1, 2, 3), (-1, -64, -1), (-(2**25), 2047, 2**25 - 1)],
+)
+def test_position_round_trip(position):
+    encoded = Position.pack(position)
+
+    assert len(encoded) == 8
+    assert Position.unpack_from(memoryview(encoded), 0) == (position, 8)
+
+
+def test_struct_without_unpack_from():
+    with pytest.raises(TypeError, match="unpack_from"):
+
+        class Incomplete(BaseStruct):
+            @classmethod
+            def pack(cls, val):
+                return b""
+
+            @classmethod
+            def unpack(cls, buffer):
+                return None
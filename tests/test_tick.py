@@ -0,0 +1,20 @@
+from src.tick import TickLoop
+
+
+def test_failing_timer_does_not_stop_the_tick():
+    loop = TickLoop()
+    ran = list()
+
+    def fail() -> None:
+        raise RuntimeError("timer failed")
+
+    loop.schedule(1, fail)
+    loop.schedule(1, ran.append, "timer")
+    loop.schedule(2, ran.append, "next timer")
+    loop.add(lambda: ran.append("task"))
+
+    loop.tick()
+    assert ran == ["timer", "task"]
+
+    loop.tick()
+    assert ran == ["timer", "task", "next timer", "task"]
@@ -0,0 +1,19 @@
+from src.world import FlatGenerator, World
+from src.world.world import SYNC_CHUNKS_PER_TICK
+
+
+def test_chunks_without_workers_are_generated_a_few_per_tick():
+    world = World(FlatGenerator())
+    positions = [(x, 0) for x in range(SYNC_CHUNKS_PER_TICK + 1)]
+
+    world.request(positions)
+    assert world.ready(0, 0) is None
+
+    world.tick()
+    assert [world.ready(x, z) is not None for x, z in positions] == [
+        *[True] * SYNC_CHUNKS_PER_TICK,
+        False,
+    ]
+
+    world.tick()
+    assert world.ready(*positions[-1]) is not None